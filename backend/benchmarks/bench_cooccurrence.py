@@ -0,0 +1,67 @@
+# benchmarks/bench_cooccurrence.py
+#
+# Edge construction cost with NER taken out: the old per-pair networkx loop
+# versus the sparse incidence-matrix engine, on synthetic entity lists.
+#
+#   cd backend && python benchmarks/bench_cooccurrence.py
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import networkx as nx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from agent.cooccurrence import build_cooccurrence_graph  # noqa: E402
+
+
+def networkx_graph(tasks, entities_per_task, scores) -> dict:
+    G = nx.Graph()
+    for task, entities, score in zip(tasks, entities_per_task, scores):
+        unique_entities = list(dict.fromkeys(entities))
+        for ent in unique_entities:
+            G.add_node(ent, label="entity")
+        for i in range(len(unique_entities)):
+            for j in range(i + 1, len(unique_entities)):
+                e1, e2 = unique_entities[i], unique_entities[j]
+                if G.has_edge(e1, e2):
+                    G[e1][e2]["weight"] += score
+                else:
+                    G.add_edge(e1, e2, weight=score, task=task)
+    return {
+        "nodes": [{"id": n, **G.nodes[n]} for n in G.nodes()],
+        "edges": [{"source": u, "target": v, **G[u][v]} for u, v in G.edges()],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="networkx loop vs sparse co-occurrence engine")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # (documents, max entities per document, entity vocabulary)
+    scenarios = [(64, 20, 200), (512, 40, 2000), (256, 300, 1500), (2048, 60, 5000)]
+    print(f"{'docs':>6} {'ents/doc':>9} {'edges':>9} {'networkx_s':>11} {'sparse_s':>9}")
+    for n_docs, max_entities, vocabulary in scenarios:
+        rng = random.Random(args.seed)
+        tasks = [f"task_{i + 1}" for i in range(n_docs)]
+        entities = [[f"Entity {rng.randrange(vocabulary)}" for _ in range(rng.randint(0, max_entities))] for _ in tasks]
+        scores = [round(rng.uniform(0.2, 0.9), 3) for _ in tasks]
+
+        start = time.perf_counter()
+        reference = networkx_graph(tasks, entities, scores)
+        networkx_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph = build_cooccurrence_graph(tasks, entities, scores)
+        sparse_s = time.perf_counter() - start
+
+        assert len(graph["edges"]) == len(reference["edges"])
+        print(f"{n_docs:>6} {max_entities:>9} {len(graph['edges']):>9} {networkx_s:>11.3f} {sparse_s:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
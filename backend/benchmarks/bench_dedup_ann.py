@@ -0,0 +1,71 @@
+# benchmarks/bench_dedup_ann.py
+#
+# Compares the exact n×n dedup path against the SimHash ANN path on synthetic
+# embeddings with planted near-duplicates (no embedding model needed).
+#
+# Recall is the fraction of items the exact path removes that the ANN path also
+# removes; agreement is the fraction of items with the same keep/remove verdict.
+#
+#   cd backend && python benchmarks/bench_dedup_ann.py --sizes 512 2048 8192
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from agent.agents.deduplication_agent import greedy_keep_mask  # noqa: E402
+from agent.ann_index import SimHashIndex, greedy_keep_mask_ann  # noqa: E402
+
+
+def synthetic_embeddings(n: int, dim: int, duplicate_rate: float, noise: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    # Turn a share of rows into noisy copies of earlier rows
+    for i in range(1, n):
+        if rng.random() < duplicate_rate:
+            vectors[i] = vectors[rng.integers(0, i)] + noise * rng.standard_normal(dim)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact vs ANN dedup recall and latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 2048, 8192])
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 embedding size")
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--noise", type=float, default=0.03)
+    parser.add_argument("--tables", type=int, default=16)
+    parser.add_argument("--bits", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'exact_s':>9} {'ann_s':>9} {'recall':>7} {'agree':>7} {'exact_MB':>9} {'ann_MB':>8}")
+    for n in args.sizes:
+        embeddings = synthetic_embeddings(n, args.dim, args.duplicate_rate, args.noise)
+
+        start = time.perf_counter()
+        exact_keep = greedy_keep_mask(embeddings @ embeddings.T, args.threshold)
+        exact_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ann_keep = greedy_keep_mask_ann(embeddings, args.threshold, n_tables=args.tables, n_bits=args.bits)
+        ann_s = time.perf_counter() - start
+
+        exact_removed = ~exact_keep
+        recall = (exact_removed & ~ann_keep).sum() / max(exact_removed.sum(), 1)
+        agreement = (exact_keep == ann_keep).mean()
+
+        # float32 similarity matrix + boolean duplicate mask vs float16 vectors + LSH tables
+        exact_mb = n * n * 5 / 1e6
+        index = SimHashIndex(args.dim, n_tables=args.tables, n_bits=args.bits)
+        index.build(embeddings)
+        ann_mb = index.nbytes() / 1e6
+
+        print(f"{n:>6} {exact_s:>9.3f} {ann_s:>9.3f} {recall:>7.3f} {agreement:>7.3f} {exact_mb:>9.1f} {ann_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
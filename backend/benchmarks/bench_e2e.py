@@ -0,0 +1,236 @@
+# benchmarks/bench_e2e.py
+#
+# End-to-end benchmark of build_graph() on offline stub providers
+# (OSINT_PROVIDER_MODE=stub), with lognormal per-call latency modelled on the
+# real providers. Reports:
+#   - per-node and total p50/p95/p99 latency at each concurrency level
+#   - throughput (investigations/s) at each concurrency level
+#   - dedup and graph-building time at scaling retrieval counts
+#   - peak RSS
+# and writes everything to a JSON file named after the current commit, so runs
+# can be diffed across commits.
+#
+# --time-scale shrinks every simulated latency and stretches every provider rate
+# limit by the same factor, so a run is a uniformly sped-up copy of the real one.
+#
+#   cd backend && python benchmarks/bench_e2e.py --concurrency 1 4 16 --runs 32
+#   cd backend && python benchmarks/bench_e2e.py --compare benchmarks/results/e2e-<old>.json
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+sys.path.insert(0, SRC_DIR)
+
+from synthetic import ORGS, PEOPLE, PLACES, synthetic_retrievals  # noqa: E402
+
+# Median seconds and lognormal sigma per provider call purpose
+PURPOSE_LATENCY = {
+    "query_parser": (1.0, 0.3),
+    "planner": (3.0, 0.3),
+    "parse_and_plan": (3.5, 0.3),
+    "web_search": (5.0, 0.5),
+    "synthesis": (8.0, 0.3),
+    "judgement": (20.0, 0.35),
+}
+NODES = ["QueryParser", "Planner", "Retriever", "Deduplicator", "Synthesis", "GraphBuilder", "Judgement"]
+
+
+def configure_stub_providers(time_scale: float):
+    os.environ["OSINT_PROVIDER_MODE"] = "stub"
+    os.environ["SEARCH_CACHE_ENABLED"] = "0"
+    for purpose, (median, sigma) in PURPOSE_LATENCY.items():
+        os.environ[f"OSINT_STUB_LATENCY_{purpose.upper()}"] = f"lognormal:{median * time_scale}:{sigma}"
+    from agent.scheduler import PROVIDER_DEFAULTS
+    for provider, defaults in PROVIDER_DEFAULTS.items():
+        os.environ.setdefault(f"{provider.upper()}_RATE_LIMIT_RPS", str(defaults["rate"] / time_scale))
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {}
+    values = np.asarray(values, dtype=float)
+    return {
+        "n": int(values.size),
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def investigation_queries(n: int) -> list:
+    # Distinct queries, so stub latencies (seeded per request) differ between runs
+    return [
+        f"Investigate {PEOPLE[i % len(PEOPLE)]} {i}, working for {ORGS[(i // 6) % len(ORGS)]} in {PLACES[(i // 36) % len(PLACES)]}"
+        for i in range(n)
+    ]
+
+
+async def run_pipeline(graph, queries: list, concurrency: int) -> dict:
+    limit = asyncio.Semaphore(concurrency)
+    totals, per_node, failures = [], {node: [] for node in NODES}, 0
+
+    async def one(query: str):
+        nonlocal failures
+        async with limit:
+            start = time.perf_counter()
+            try:
+                state = await graph.ainvoke({
+                    "query": query,
+                    "retrieval_model": "gpt-4o-mini-search-preview",
+                    "synthesis_model": "gemini-2.0-flash",
+                })
+            except Exception as e:
+                failures += 1
+                print(f"❌ {query}: {e}")
+                return
+            totals.append(time.perf_counter() - start)
+            for node, usage in (state.get("timings") or {}).items():
+                per_node.setdefault(node, []).append(usage["seconds"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(q) for q in queries])
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "runs": len(queries),
+        "failures": failures,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(len(totals) / wall, 4) if wall else 0.0,
+        "total": percentiles(totals),
+        "nodes": {node: percentiles(values) for node, values in per_node.items() if values},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_scaling(sizes: list, repeats: int) -> list:
+    from agent.agents.deduplication_agent import deduplication_agent
+    from agent.agents.graph_builder_agent import graph_builder_agent
+
+    rows = []
+    for n in sizes:
+        dedup_s, graph_s, kept = [], [], 0
+        for r in range(repeats):
+            # A fresh seed per repeat keeps the embedding cache cold
+            retrievals = synthetic_retrievals(n, seed=n * 1000 + r)
+            start = time.perf_counter()
+            deduplicated = deduplication_agent(retrievals)
+            dedup_s.append(time.perf_counter() - start)
+            kept = len(deduplicated)
+            start = time.perf_counter()
+            graph_builder_agent(retrievals)
+            graph_s.append(time.perf_counter() - start)
+        rows.append({
+            "retrievals": n,
+            "kept_after_dedup": kept,
+            "dedup": percentiles(dedup_s),
+            "graph_build": percentiles(graph_s),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+        print(f"  {n:>5} retrievals: dedup p50 {rows[-1]['dedup']['p50']:.3f}s, graph p50 {rows[-1]['graph_build']['p50']:.3f}s")
+    return rows
+
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n📈 vs {baseline.get('commit')} ({baseline_path})")
+    old_runs = {r["concurrency"]: r for r in baseline.get("pipeline", [])}
+    for run in current["pipeline"]:
+        old = old_runs.get(run["concurrency"])
+        if old:
+            print(f"  c={run['concurrency']:>3} total p95 {old['total'].get('p95')} → {run['total'].get('p95')}s, "
+                  f"throughput {old['throughput_per_s']} → {run['throughput_per_s']}/s")
+    old_rows = {r["retrievals"]: r for r in baseline.get("scaling", [])}
+    for row in current["scaling"]:
+        old = old_rows.get(row["retrievals"])
+        if old:
+            print(f"  n={row['retrievals']:>5} dedup p50 {old['dedup']['p50']} → {row['dedup']['p50']}s, "
+                  f"graph p50 {old['graph_build']['p50']} → {row['graph_build']['p50']}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on offline stub providers")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=16, help="Investigations per concurrency level")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier on simulated provider latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 64, 512, 4096])
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats per scaling size")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/e2e-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    configure_stub_providers(args.time_scale)
+    from agent.langgraph_app import build_graph
+    from agent.models import warm_up
+
+    # Model loading is measured by bench_startup.py; keep it out of these numbers
+    warm_up()
+    graph = build_graph()
+
+    results = {
+        "benchmark": "e2e",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "time_scale": args.time_scale,
+            "purpose_latency": {k: {"median_s": m, "sigma": s} for k, (m, s) in PURPOSE_LATENCY.items()},
+            "runs": args.runs,
+        },
+        "pipeline": [],
+        "scaling": [],
+    }
+
+    print(f"🚀 Pipeline: {args.runs} investigations per level, latency × {args.time_scale}")
+    for concurrency in args.concurrency:
+        run = await run_pipeline(graph, investigation_queries(args.runs), concurrency)
+        results["pipeline"].append(run)
+        total = run["total"]
+        print(f"  c={concurrency:>3}: total p50 {total.get('p50')}s p95 {total.get('p95')}s p99 {total.get('p99')}s, "
+              f"{run['throughput_per_s']}/s, {run['failures']} failed")
+        for node in NODES:
+            if node in run["nodes"]:
+                stats = run["nodes"][node]
+                print(f"        {node:<13} p50 {stats['p50']:.3f}s p95 {stats['p95']:.3f}s p99 {stats['p99']:.3f}s")
+
+    print("📊 Dedup and graph building")
+    results["scaling"] = bench_scaling(args.sizes, args.repeats)
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"🧠 Peak RSS {results['peak_rss_mb']} MB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"e2e-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"📦 Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+# benchmarks/bench_parallel_branches.py
+#
+# Compares wall-clock time of the serial Deduplicator → Synthesis → GraphBuilder
+# chain against the parallel Synthesis/GraphBuilder branches.
+#
+# LLM agents are replaced by sleeps that mimic provider latency; dedup and the
+# spaCy graph builder run for real, so the saving shown is the CPU time hidden
+# behind the synthesis call.
+#
+#   cd backend && python benchmarks/bench_parallel_branches.py --runs 5
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import agent.langgraph_app as langgraph_app  # noqa: E402
+from synthetic import synthetic_retrievals  # noqa: E402
+
+
+def install_fake_providers(retrievals: dict, synthesis_latency: float, judgement_latency: float):
+    async def query_parser_agent(query):
+        return {"entity_type": "person", "entity_name": "Jane Doe", "keywords": [], "affiliation": "Acme Corp", "location": "Berlin"}
+
+    async def planner_agent(*args, **kwargs):
+        return [r["query_used"] for r in retrievals.values()]
+
+    async def retriever_pivot_agent(tasks, entity_name, model_name, on_result=None, **kwargs):
+        return dict(retrievals)
+
+    async def synthesis_agent(deduplicated, entity_name, model_name, **kwargs):
+        await asyncio.sleep(synthesis_latency)
+        return "synthetic report"
+
+    async def judgement_agent(entity_name, report, deduplicated, **kwargs):
+        await asyncio.sleep(judgement_latency)
+        return {"credibility_score": "8", "flagged_issues": [], "risk_assessment": {}}
+
+    langgraph_app.query_parser_agent = query_parser_agent
+    langgraph_app.planner_agent = planner_agent
+    langgraph_app.retriever_pivot_agent = retriever_pivot_agent
+    langgraph_app.synthesis_agent = synthesis_agent
+    langgraph_app.judgement_agent = judgement_agent
+
+
+async def time_graph(graph, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await graph.ainvoke({"query": "Investigate Jane Doe"})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Serial vs parallel Synthesis/GraphBuilder timing")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--retrievals", type=int, default=64)
+    parser.add_argument("--synthesis-latency", type=float, default=2.0, help="Seconds the fake synthesis call takes")
+    parser.add_argument("--judgement-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    retrievals = synthetic_retrievals(args.retrievals)
+    install_fake_providers(retrievals, args.synthesis_latency, args.judgement_latency)
+
+    # Warm up models so first-run loading does not skew either variant
+    await langgraph_app.build_graph().ainvoke({"query": "warm up"})
+
+    serial = await time_graph(langgraph_app.build_graph(parallel_branches=False), args.runs)
+    parallel = await time_graph(langgraph_app.build_graph(parallel_branches=True), args.runs)
+
+    serial_median = statistics.median(serial)
+    parallel_median = statistics.median(parallel)
+    print(f"\n📊 {args.retrievals} retrievals, synthesis latency {args.synthesis_latency:.2f}s, {args.runs} runs")
+    print(f"Serial   median: {serial_median:.3f}s")
+    print(f"Parallel median: {parallel_median:.3f}s")
+    print(f"Saved wall-clock: {serial_median - parallel_median:.3f}s per investigation")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
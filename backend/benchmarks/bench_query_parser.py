@@ -0,0 +1,144 @@
+# benchmarks/bench_query_parser.py
+#
+# Accuracy and latency of the local query parser on a labelled query set:
+# per-field accuracy, how many queries clear each confidence threshold (and so
+# skip the LLM), and how accurate the accepted ones are. With --llm the LLM
+# parser runs on the same set under the current OSINT_PROVIDER_MODE, and the
+# hybrid (local above the threshold, LLM below) is scored too.
+#
+#   cd backend && python benchmarks/bench_query_parser.py
+#   cd backend && OSINT_PROVIDER_MODE=replay python benchmarks/bench_query_parser.py --llm
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from agent.agents.local_query_parser import local_parse  # noqa: E402
+from agent.agents.query_parser_agent import LOCAL_PARSER_MIN_CONFIDENCE, llm_query_parser  # noqa: E402
+from agent.models import get_nlp  # noqa: E402
+
+FIELDS = ["entity_type", "entity_name", "affiliation", "location", "nationality"]
+
+# (query, expected fields); unspecified fields are expected to be empty
+LABELLED_QUERIES = [
+    ("Investigate Jane Doe", {"entity_type": "person", "entity_name": "Jane Doe"}),
+    ("Investigate Jane Doe, data scientist at Acme in Berlin",
+     {"entity_type": "person", "entity_name": "Jane Doe", "affiliation": "Acme", "location": "Berlin"}),
+    ("Investigate Elon Musk", {"entity_type": "person", "entity_name": "Elon Musk"}),
+    ("Research Satya Nadella, CEO of Microsoft",
+     {"entity_type": "person", "entity_name": "Satya Nadella", "affiliation": "Microsoft"}),
+    ("Look up Maria Garcia from Madrid", {"entity_type": "person", "entity_name": "Maria Garcia", "location": "Madrid"}),
+    ("Investigate Ali Khaledi Nasab", {"entity_type": "person", "entity_name": "Ali Khaledi Nasab"}),
+    ("Investigate Muhammad Aqib Iqbal, AI engineer at Turing in Oman",
+     {"entity_type": "person", "entity_name": "Muhammad Aqib Iqbal", "affiliation": "Turing", "location": "Oman"}),
+    ("Background check on John Smith, accountant in London",
+     {"entity_type": "person", "entity_name": "John Smith", "location": "London"}),
+    ("Investigate Wei Zhang, professor at Tsinghua University in Beijing",
+     {"entity_type": "person", "entity_name": "Wei Zhang", "affiliation": "Tsinghua University", "location": "Beijing"}),
+    ("Investigate Olga Petrova, a Russian journalist",
+     {"entity_type": "person", "entity_name": "Olga Petrova", "nationality": "Russian"}),
+    ("Investigate Acme Corp", {"entity_type": "organization", "entity_name": "Acme Corp"}),
+    ("Investigate Deutsche Bank in Frankfurt",
+     {"entity_type": "organization", "entity_name": "Deutsche Bank", "location": "Frankfurt"}),
+    ("Research Siemens AG", {"entity_type": "organization", "entity_name": "Siemens AG"}),
+    ("Look into Cambridge Analytica", {"entity_type": "organization", "entity_name": "Cambridge Analytica"}),
+    ("Investigate Reuters", {"entity_type": "organization", "entity_name": "Reuters"}),
+    ("Investigate Sam Altman of OpenAI in San Francisco",
+     {"entity_type": "person", "entity_name": "Sam Altman", "affiliation": "OpenAI", "location": "San Francisco"}),
+    ("Profile Priya Sharma, software engineer at Google",
+     {"entity_type": "person", "entity_name": "Priya Sharma", "affiliation": "Google"}),
+    ("Investigate Pakistani entrepreneur Usman Tariq",
+     {"entity_type": "person", "entity_name": "Usman Tariq", "nationality": "Pakistani"}),
+    ("Check out Oxford University", {"entity_type": "organization", "entity_name": "Oxford University"}),
+    ("Investigate Hans Müller, director at Bosch in Stuttgart",
+     {"entity_type": "person", "entity_name": "Hans Müller", "affiliation": "Bosch", "location": "Stuttgart"}),
+    # Harder shapes; the local parser should defer these to the LLM
+    ("who is behind the ransomware group that hit Maersk?", {"entity_type": "organization", "entity_name": ""}),
+    ("Investigate the links between Jane Doe and John Smith", {"entity_type": "person", "entity_name": "Jane Doe"}),
+    ("find the owner of the shell companies registered to 12 Baker Street", {"entity_type": "person", "entity_name": ""}),
+    ("investigate jane doe", {"entity_type": "person", "entity_name": "jane doe"}),
+    ("Anything on the new CFO at Wirecard and whether she worked at EY?",
+     {"entity_type": "person", "entity_name": "", "affiliation": "Wirecard"}),
+    ("Investigate Tesla and its board members", {"entity_type": "organization", "entity_name": "Tesla"}),
+]
+
+
+def normalize(value) -> str:
+    return " ".join(str(value or "").casefold().split())
+
+
+def score(parsed: dict, expected: dict) -> dict:
+    return {f: normalize(parsed.get(f)) == normalize(expected.get(f, "")) for f in FIELDS}
+
+
+def summarize(label: str, scored: list, latencies: list):
+    if not scored:
+        print(f"  {label}: no queries")
+        return
+    per_field = {f: np.mean([s[f] for s in scored]) for f in FIELDS}
+    exact = np.mean([all(s.values()) for s in scored])
+    fields = ", ".join(f"{f} {v:.0%}" for f, v in per_field.items())
+    print(f"  {label}: {len(scored)} queries, all fields {exact:.0%} ({fields})")
+    if latencies:
+        print(f"      latency p50 {np.percentile(latencies, 50) * 1000:.2f}ms, p95 {np.percentile(latencies, 95) * 1000:.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local query parser accuracy and latency")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.75, 0.9])
+    parser.add_argument("--llm", action="store_true", help="Also run the LLM parser and score the hybrid")
+    args = parser.parse_args()
+
+    get_nlp()
+    local_parse("Warm up for Jane Doe at Acme in Berlin")
+
+    results = []
+    for query, expected in LABELLED_QUERIES:
+        start = time.perf_counter()
+        parsed, confidence = local_parse(query)
+        results.append({
+            "query": query, "expected": expected, "parsed": parsed, "confidence": confidence,
+            "seconds": time.perf_counter() - start, "score": score(parsed, expected),
+        })
+
+    print(f"📊 Local parser on {len(results)} labelled queries")
+    summarize("all", [r["score"] for r in results], [r["seconds"] for r in results])
+    for threshold in args.thresholds:
+        accepted = [r for r in results if r["confidence"] >= threshold]
+        marker = " (configured)" if threshold == LOCAL_PARSER_MIN_CONFIDENCE else ""
+        print(f"  threshold {threshold}{marker}: {len(accepted) / len(results):.0%} skip the LLM")
+        summarize(f"accepted at {threshold}", [r["score"] for r in accepted], [])
+
+    misses = [r for r in results if r["confidence"] >= LOCAL_PARSER_MIN_CONFIDENCE and not all(r["score"].values())]
+    for r in misses:
+        wrong = {f: r["parsed"].get(f) for f, ok in r["score"].items() if not ok}
+        print(f"  ❌ accepted but wrong ({r['confidence']:.2f}): {r['query']} → {wrong}")
+
+    if args.llm:
+        print(f"🤖 LLM parser ({os.getenv('OSINT_PROVIDER_MODE', 'live')} mode)")
+        llm_scores, llm_latency, hybrid_scores, hybrid_latency = [], [], [], []
+        for r in results:
+            start = time.perf_counter()
+            try:
+                parsed = await llm_query_parser(r["query"])
+            except Exception as e:
+                print(f"  ❌ {r['query']}: {e}")
+                parsed = {}
+            seconds = time.perf_counter() - start
+            llm_scores.append(score(parsed, r["expected"]))
+            llm_latency.append(seconds)
+            local = r["confidence"] >= LOCAL_PARSER_MIN_CONFIDENCE
+            hybrid_scores.append(r["score"] if local else llm_scores[-1])
+            hybrid_latency.append(r["seconds"] if local else r["seconds"] + seconds)
+        summarize("llm", llm_scores, llm_latency)
+        summarize(f"hybrid at {LOCAL_PARSER_MIN_CONFIDENCE}", hybrid_scores, hybrid_latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
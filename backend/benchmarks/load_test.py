@@ -0,0 +1,249 @@
+# benchmarks/load_test.py
+#
+# HTTP load test of api_server.py. Starts uvicorn with stubbed providers (see
+# bench_e2e.py for the latency model) in a scratch directory whose output_logs/
+# is seeded with --history-files audit logs, then drives each scenario with a
+# closed loop of N concurrent clients per level:
+#   investigate  - POST /osint/investigate
+#   stream       - POST /osint/investigate-stream (also time to first byte)
+#   history      - GET /osint/history
+#   history_view - GET /osint/history/view/<file>
+#   history_load - GET /osint/history/load/<file>
+# Each level reports throughput, p50/p95/p99 latency and error rate; the
+# saturation point is the first level where throughput stops growing by at
+# least --knee while latency keeps rising, or errors exceed 1%.
+#
+#   cd backend && python benchmarks/load_test.py --workers 2 --concurrency 1 4 16 64
+#   cd backend && python benchmarks/load_test.py --url http://localhost:8000 --scenarios history
+#
+# With --url nothing is started or seeded; the server's own output_logs/ is used.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from bench_e2e import RESULTS_DIR, SRC_DIR, configure_stub_providers, git_commit, investigation_queries, percentiles
+from synthetic import ORGS, PEOPLE, synthetic_retrievals
+
+SCENARIOS = ["investigate", "stream", "history", "history_view", "history_load"]
+
+
+# --- Server ---
+
+def seed_history(output_dir: str, n: int) -> int:
+    os.makedirs(output_dir, exist_ok=True)
+    retrievals = synthetic_retrievals(8)
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        entity = f"{PEOPLE[i % len(PEOPLE)]} {ORGS[i % len(ORGS)]} {i}"
+        state = {
+            "query": f"Investigate {entity}",
+            "parsed": {"entity_type": "person", "entity_name": entity, "keywords": ["career", "news"]},
+            "tasks": [r["query_used"] for r in retrievals.values()],
+            "retrievals": retrievals,
+            "report": f"## OSINT Intelligence Report: {entity}\n\nNo adverse media identified.\n",
+            "judgement": {"credibility_score": "7", "flagged_issues": [], "risk_assessment": {"risk_score": "2", "verdict": "LOW"}},
+            "retry_count": 1,
+        }
+        timestamp = (start + timedelta(minutes=i)).strftime("%Y%m%d-%H%M%S")
+        with open(os.path.join(output_dir, f"{entity.replace(' ', '_')}_{timestamp}.json"), "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    return n
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+    # Relative paths (output_logs/, *.db) resolve inside the scratch directory
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "agent.api_server:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, server, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+
+# --- Scenarios ---
+
+class Scenario:
+    def __init__(self, name: str, history_files: list):
+        self.name = name
+        self.history_files = history_files
+        self.queries = investigation_queries(100_000)
+        self.next_query = 0
+
+    def query(self) -> str:
+        self.next_query += 1
+        return self.queries[self.next_query % len(self.queries)]
+
+    async def request(self, client: httpx.AsyncClient, rng: random.Random) -> dict:
+        """One request; returns seconds, ttfb and ok."""
+        start = time.perf_counter()
+        ttfb = None
+        if self.name == "investigate":
+            response = await client.post("/osint/investigate", json={"query": self.query()})
+            ok = response.status_code == 200
+        elif self.name == "stream":
+            ok = False
+            async with client.stream("POST", "/osint/investigate-stream", json={"query": self.query()}) as response:
+                async for line in response.aiter_lines():
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - start
+                    if line.startswith('{"final"'):
+                        ok = response.status_code == 200
+                    elif line.startswith('{"error"'):
+                        break
+        elif self.name == "history":
+            ok = (await client.get("/osint/history")).status_code == 200
+        else:
+            action = "view" if self.name == "history_view" else "load"
+            response = await client.get(f"/osint/history/{action}/{rng.choice(self.history_files)}")
+            ok = response.status_code == 200
+        return {"seconds": time.perf_counter() - start, "ttfb": ttfb, "ok": ok}
+
+
+async def run_level(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, duration: float) -> dict:
+    samples, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def user(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            try:
+                sample = await scenario.request(client, rng)
+            except httpx.HTTPError:
+                sample = {"seconds": 0.0, "ttfb": None, "ok": False}
+            if sample["ok"]:
+                samples.append(sample)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[user(i) for i in range(concurrency)])
+    wall = time.perf_counter() - start
+    total = len(samples) + errors
+    level = {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_per_s": round(len(samples) / wall, 3) if wall else 0.0,
+        "latency": percentiles([s["seconds"] for s in samples]),
+    }
+    ttfbs = [s["ttfb"] for s in samples if s["ttfb"] is not None]
+    if ttfbs:
+        level["ttfb"] = percentiles(ttfbs)
+    return level
+
+
+def saturation_point(levels: list, knee: float):
+    """Concurrency of the first level past which more clients add latency but not throughput."""
+    for previous, level in zip(levels, levels[1:]):
+        if level["error_rate"] > 0.01:
+            return previous["concurrency"]
+        gained = level["throughput_per_s"] < previous["throughput_per_s"] * (1 + knee)
+        slower = level["latency"].get("p50", 0) > previous["latency"].get("p50", 0)
+        if gained and slower:
+            return previous["concurrency"]
+    return None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="HTTP load test of the FastAPI server with stubbed providers")
+    parser.add_argument("--url", help="Target an already-running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--history-files", type=int, default=5000, help="Audit logs to seed output_logs/ with")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier on simulated provider latency")
+    parser.add_argument("--knee", type=float, default=0.1, help="Minimum throughput gain per level before saturation")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/load-<commit>.json)")
+    args = parser.parse_args()
+
+    server, workdir, history_files = None, None, []
+    base_url = args.url
+    if base_url is None:
+        configure_stub_providers(args.time_scale)
+        # Distinct queries never coalesce, so each request is a full pipeline run
+        os.environ.setdefault("OSINT_COALESCE_ENABLED", "0")
+        workdir = tempfile.mkdtemp(prefix="osint-load-")
+        print(f"📦 Seeding {args.history_files} audit logs in {workdir}")
+        seed_history(os.path.join(workdir, "output_logs"), args.history_files)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(workdir, port, args.workers)
+
+    results = {
+        "benchmark": "load",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "scenarios": {},
+    }
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+            await wait_ready(client, server, timeout=300)
+            history_files = (await client.get("/osint/history")).json() or ["missing.json"]
+            print(f"🚀 {base_url}: {len(history_files)} history files, {args.workers} worker(s)")
+
+            for name in args.scenarios:
+                scenario = Scenario(name, history_files)
+                levels = []
+                for concurrency in args.concurrency:
+                    level = await run_level(client, scenario, concurrency, args.duration)
+                    levels.append(level)
+                    latency = level["latency"]
+                    ttfb = f", ttfb p95 {level['ttfb']['p95']}s" if "ttfb" in level else ""
+                    print(f"  {name:<13} c={concurrency:>3}: {level['throughput_per_s']}/s, p50 {latency.get('p50')}s "
+                          f"p95 {latency.get('p95')}s p99 {latency.get('p99')}s{ttfb}, {level['error_rate']:.1%} errors")
+                saturated = saturation_point(levels, args.knee)
+                results["scenarios"][name] = {"levels": levels, "saturation_concurrency": saturated}
+                print(f"📊 {name}: " + (f"saturates at c={saturated}" if saturated else "no saturation within tested levels"))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"📦 Results written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
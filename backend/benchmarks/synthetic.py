@@ -0,0 +1,40 @@
+# benchmarks/synthetic.py
+#
+# Synthetic retrieval corpora shared by the benchmark scripts.
+
+import random
+
+PEOPLE = ["Jane Doe", "John Smith", "Ali Khan", "Maria Garcia", "Wei Zhang", "Olga Petrova"]
+ORGS = ["Acme Corp", "Amazon", "Siemens", "Deutsche Bank", "Oxford University", "Reuters"]
+PLACES = ["Berlin", "London", "Oman", "Karachi", "New York", "Paris"]
+TEMPLATES = [
+    "{person} joined {org} in {place} in {year}.",
+    "A court filing in {place} names {person} as a director of {org}.",
+    "{org} announced a partnership with {person}'s lab at a {year} conference in {place}.",
+    "Local press in {place} reported that {person} left {org} after {year}.",
+    "{person} co-authored a {year} paper on supply chains with researchers from {org}.",
+    "Registry records list {org} at an address in {place} with {person} as signatory.",
+]
+
+
+def synthetic_retrievals(n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    retrievals = {}
+    for i in range(n):
+        sentences = [
+            rng.choice(TEMPLATES).format(
+                person=rng.choice(PEOPLE), org=rng.choice(ORGS), place=rng.choice(PLACES), year=rng.randint(2001, 2024)
+            )
+            for _ in range(rng.randint(4, 10))
+        ]
+        text = " ".join(sentences) + f" Record {i}."
+        retrievals[f"task_{i + 1}"] = {
+            "source": "web_search_preview",
+            "query_used": f"task {i + 1}",
+            "data": text,
+            "confidence": 0.9,
+            "decayed_score": 0.9,
+            "hash": f"bench-{seed}-{i}",
+            "citations": [],
+        }
+    return retrievals
@@ -1,27 +1,89 @@
 # src/agent/agents/deduplication_agent.py
 
-from sentence_transformers import SentenceTransformer, util
+import os
+from typing import List
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
 
-def deduplication_agent(retrievals: dict, similarity_threshold: float = 0.85) -> dict:
-    tasks = list(retrievals.keys())
-    texts = [retrievals[t]["data"] for t in tasks]
+from agent.ann_index import greedy_keep_mask_ann
+from agent.lru_cache import LRUCache, retrieval_key
+from agent.models import get_embedding_model
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+# "exact" builds the full n×n similarity matrix, "ann" uses the SimHash index,
+# "auto" switches to ANN once there are at least DEDUP_ANN_MIN_ITEMS retrievals.
+DEDUP_MODE = os.getenv("DEDUP_MODE", "auto")
+DEDUP_ANN_MIN_ITEMS = int(os.getenv("DEDUP_ANN_MIN_ITEMS", "4096"))
+DEDUP_ANN_TABLES = int(os.getenv("DEDUP_ANN_TABLES", "16"))
+DEDUP_ANN_BITS = int(os.getenv("DEDUP_ANN_BITS", "8"))
+
+# --- Embedding Cache ---
+
+# L2-normalized embeddings keyed on each retrieval's content hash
+embedding_cache = LRUCache(EMBEDDING_CACHE_SIZE)
+
+def embed_retrievals(retrievals: List[dict]) -> np.ndarray:
+    """Return L2-normalized embeddings, encoding only texts not seen before."""
+    keys = [retrieval_key(r) for r in retrievals]
+    vectors = embedding_cache.get_many(keys)
+
+    # Identical texts within one batch are encoded once
+    missing = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(keys[i], i)
+    if missing:
+        encoded = get_embedding_model().encode(
+            [retrievals[i].get("data", "") for i in missing.values()],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype(np.float32)
+        embedding_cache.put_many(list(missing), encoded)
+        by_key = dict(zip(missing, encoded))
+        vectors = [by_key[key] if vector is None else vector for key, vector in zip(keys, vectors)]
 
-    embeddings = model.encode(texts, convert_to_tensor=True)
-    similarity_matrix = util.pytorch_cos_sim(embeddings, embeddings)
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack(vectors)
 
-    keep = set()
-    remove = set()
+# --- Greedy Selection ---
+
+def greedy_keep_mask(similarity_matrix: np.ndarray, similarity_threshold: float) -> np.ndarray:
+    """Keep each item unless an earlier *kept* item is a near-duplicate of it.
+
+    Same result as walking the matrix pair by pair, but each kept row is applied
+    as one boolean mask and rows without any near-duplicates are skipped.
+    """
+    n = similarity_matrix.shape[0]
+    # duplicates[i, j] is True when j comes after i and is too similar to it
+    duplicates = np.triu(similarity_matrix > similarity_threshold, k=1)
+    removed = np.zeros(n, dtype=bool)
+    for i in np.flatnonzero(duplicates.any(axis=1)):
+        if not removed[i]:
+            removed |= duplicates[i]
+    return ~removed
+
+def resolve_dedup_mode(n_items: int, mode: str | None = None) -> str:
+    mode = mode or DEDUP_MODE
+    if mode == "auto":
+        return "ann" if n_items >= DEDUP_ANN_MIN_ITEMS else "exact"
+    if mode not in ("exact", "ann"):
+        raise ValueError(f"Unknown dedup mode: {mode}")
+    return mode
+
+def deduplication_agent(retrievals: dict, similarity_threshold: float = 0.85, mode: str | None = None) -> dict:
+    tasks = list(retrievals.keys())
+    if not tasks:
+        return {}
 
-    for i in range(len(tasks)):
-        if tasks[i] in remove:
-            continue
-        keep.add(tasks[i])
-        for j in range(i + 1, len(tasks)):
-            if similarity_matrix[i][j] > similarity_threshold:
-                remove.add(tasks[j])
+    embeddings = embed_retrievals([retrievals[t] for t in tasks])
+    if resolve_dedup_mode(len(tasks), mode) == "ann":
+        keep = greedy_keep_mask_ann(embeddings, similarity_threshold, n_tables=DEDUP_ANN_TABLES, n_bits=DEDUP_ANN_BITS)
+    else:
+        # Exact reference path
+        similarity_matrix = embeddings @ embeddings.T
+        keep = greedy_keep_mask(similarity_matrix, similarity_threshold)
 
     # Filter retrievals
-    filtered = {k: v for k, v in retrievals.items() if k in keep}
+    filtered = {t: retrievals[t] for t, kept in zip(tasks, keep) if kept}
     return filtered
@@ -1,38 +1,50 @@
 # src/agent/agents/graph_builder_agent.py
 
-import spacy
-import networkx as nx
-from typing import Dict
-
-nlp = spacy.load("en_core_web_sm")
+import os
+from typing import Dict, List
+
+from agent.cooccurrence import build_cooccurrence_graph
+from agent.lru_cache import LRUCache, retrieval_key
+from agent.models import get_nlp
+
+GRAPH_ENTITY_LABELS = {"PERSON", "ORG", "GPE"}
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "64"))
+# Worker processes for nlp.pipe; only used for batches of NER_MULTIPROCESS_MIN_DOCS or more
+NER_N_PROCESS = int(os.getenv("NER_N_PROCESS", "1"))
+NER_MULTIPROCESS_MIN_DOCS = int(os.getenv("NER_MULTIPROCESS_MIN_DOCS", "512"))
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))
+
+# Graph entity lists keyed on each retrieval's content hash
+entity_cache = LRUCache(ENTITY_CACHE_SIZE)
+
+def extract_entities(texts: List[str], n_process: int | None = None) -> List[List[str]]:
+    """Run NER over all texts in one nlp.pipe batch and return entity strings per text."""
+    n_process = n_process or NER_N_PROCESS
+    if len(texts) < NER_MULTIPROCESS_MIN_DOCS:
+        n_process = 1
+
+    docs = get_nlp().pipe(texts, batch_size=NER_BATCH_SIZE, n_process=n_process)
+    return [[ent.text for ent in doc.ents if ent.label_ in GRAPH_ENTITY_LABELS] for doc in docs]
+
+def extract_retrieval_entities(retrievals: List[Dict]) -> List[List[str]]:
+    """extract_entities over retrievals, running NER only on texts not seen before."""
+    keys = [retrieval_key(r) for r in retrievals]
+    entities = entity_cache.get_many(keys)
+    missing = {}
+    for i, found in enumerate(entities):
+        if found is None:
+            missing.setdefault(keys[i], i)
+    if missing:
+        extracted = extract_entities([retrievals[i].get("data", "") or "" for i in missing.values()])
+        entity_cache.put_many(list(missing), extracted)
+        by_key = dict(zip(missing, extracted))
+        entities = [by_key[key] if found is None else found for key, found in zip(keys, entities)]
+    return entities
 
 def graph_builder_agent(retrievals: Dict[str, Dict]) -> Dict:
-    G = nx.Graph()
-
-    for task, result in retrievals.items():
-        text = result.get("data", "")
-        score = result.get("decayed_score", 0.0)
-        doc = nlp(text)
-
-        entities = [ent.text for ent in doc.ents if ent.label_ in ["PERSON", "ORG", "GPE"]]
-        unique_entities = list(set(entities))
-
-        # Create nodes
-        for ent in unique_entities:
-            G.add_node(ent, label="entity")
-
-        # Create weighted edges
-        for i in range(len(unique_entities)):
-            for j in range(i+1, len(unique_entities)):
-                e1, e2 = unique_entities[i], unique_entities[j]
-                if G.has_edge(e1, e2):
-                    G[e1][e2]['weight'] += score
-                else:
-                    G.add_edge(e1, e2, weight=score, task=task)
+    tasks = list(retrievals.keys())
+    entities_per_task = extract_retrieval_entities([retrievals[t] for t in tasks])
+    scores = [retrievals[t].get("decayed_score", 0.0) or 0.0 for t in tasks]
 
     # Return graph as dict (for frontend use or persistence)
-    graph_data = {
-        "nodes": [{"id": n, **G.nodes[n]} for n in G.nodes()],
-        "edges": [{"source": u, "target": v, **G[u][v]} for u, v in G.edges()]
-    }
-    return graph_data
+    return build_cooccurrence_graph(tasks, entities_per_task, scores)
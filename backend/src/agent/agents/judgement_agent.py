@@ -1,15 +1,17 @@
-import os
 import json
 from dotenv import load_dotenv
-from anthropic import Anthropic
+
+from agent.evidence import link_evidence_ids, pack_evidence
+from agent.providers import anthropic_messages, cached_system
+from agent.scheduler import get_scheduler
 
 load_dotenv()
 
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+JUDGEMENT_MODEL = "claude-opus-4-20250514"
 
-def judgement_agent(entity_name: str, raw_report: str, retrievals: dict) -> dict:
-    prompt = f"""
-You are Claude Opus 4, acting as the **final QA and Risk Assessment agent** in an OSINT AI pipeline.
+# Static instructions and output schema; the report and evidence go in the user
+# message. Shorter than Opus's cache minimum, so cached_system sends it uncached
+JUDGEMENT_SYSTEM = """You are Claude Opus 4, acting as the **final QA and Risk Assessment agent** in an OSINT AI pipeline.
 
 Your task is to:
 1. Verify the report's **factual accuracy** against the provided retrieval evidence.
@@ -23,37 +25,43 @@ Your task is to:
    - Classify overall **risk level** as LOW / MEDIUM / HIGH.
    - List all **risk signals** with supporting evidence.
 7. Return a **revised version** of the report (if needed) that is more accurate, better cited, and well-organized.
-8. Add **footnotes or citations** as needed to clarify provenance or support claims.
-
----
-
-### Entity: {entity_name}
-
-### Synthesized Report:
-{raw_report}
-
-### Retrieval Evidence:
-{json.dumps(retrievals, indent=2)}
+8. Add **footnotes or citations** as needed to clarify provenance or support claims, citing evidence by its ID (e.g. [E1]).
 
 Respond ONLY in this exact JSON format (no markdown, no explanations):
 
-{{
+{
   "credibility_score": "<1–10>",
   "flagged_issues": ["<issues found in the report>"],
-  "risk_assessment": {{
+  "risk_assessment": {
     "risk_score": "<1–10>",
     "verdict": "<LOW | MEDIUM | HIGH>",
     "risk_signals": ["<explanation of any potential risks>"]
-  }},
+  },
   "revised_report": "<final, improved version of the report>"
-}}
+}"""
+
+async def judgement_agent(entity_name: str, raw_report: str, retrievals: dict) -> dict:
+    # Compact, token-budgeted evidence; evidence_index maps its IDs back to tasks and URLs
+    evidence, evidence_index = pack_evidence(retrievals)
+
+    prompt = f"""### Entity: {entity_name}
+
+### Synthesized Report:
+{raw_report}
+
+### Retrieval Evidence:
+{evidence}
 """
 
-    response = client.messages.create(
-        model="claude-opus-4-20250514",
-        max_tokens=1800,
-        temperature=0.1,
-        messages=[{"role": "user", "content": prompt}]
+    response = await get_scheduler("anthropic", JUDGEMENT_MODEL).run(
+        lambda: anthropic_messages(
+            "judgement",
+            model=JUDGEMENT_MODEL,
+            max_tokens=1800,
+            temperature=0.1,
+            system=cached_system(JUDGEMENT_SYSTEM, JUDGEMENT_MODEL),
+            messages=[{"role": "user", "content": prompt}]
+        )
     )
 
     text = response.content[0].text.strip()
@@ -72,7 +80,8 @@ Respond ONLY in this exact JSON format (no markdown, no explanations):
                 "verdict": "UNKNOWN",
                 "risk_signals": ["Risk assessment not available."]
             }),
-            "revised_report": result.get("revised_report", raw_report)
+            "revised_report": link_evidence_ids(result.get("revised_report", raw_report), evidence_index),
+            "evidence": evidence_index
         }
     except Exception as e:
         return {
@@ -83,5 +92,6 @@ Respond ONLY in this exact JSON format (no markdown, no explanations):
                 "verdict": "UNKNOWN",
                 "risk_signals": ["Unable to parse risk assessment due to formatting issue."]
             },
-            "revised_report": raw_report
+            "revised_report": raw_report,
+            "evidence": evidence_index
         }
@@ -0,0 +1,124 @@
+# src/agent/agents/local_query_parser.py
+#
+# Rule-based parser for the common query shape
+#   "Investigate <name>[, <role>] [at <organization>] [in <place>]"
+# spaCy NER finds the subject, affiliation, location and nationality. The
+# confidence score reflects how much of the query the rules accounted for:
+# leftover proper nouns, several possible subjects or clause-like phrasing
+# lower it, and query_parser_agent falls back to the LLM below its threshold.
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from agent.models import get_nlp
+
+LEAD_IN = re.compile(
+    r"^\s*(?:please\s+)?(?:investigate|research(?:\s+on)?|look\s+(?:up|into)|profile|check(?:\s+out)?|"
+    r"find\s+(?:info(?:rmation)?\s+)?(?:on|about)|background(?:\s+check)?\s+on|osint\s+on|"
+    r"run\s+(?:an\s+)?osint(?:\s+investigation)?\s+on)\s*:?\s+",
+    re.I,
+)
+ORG_SUFFIX = re.compile(
+    r"\b(?:inc|ltd|llc|plc|corp|corporation|company|co|group|gmbh|ag|sa|bank|university|institute|foundation|"
+    r"holdings|technologies|labs?|partners|capital|ventures|agency|ministry)\.?$",
+    re.I,
+)
+AFFILIATION_CUE = re.compile(r"\b(?:at|for|with|of|by|joined|employed\s+by)\s*$", re.I)
+LOCATION_CUE = re.compile(r"\b(?:in|based\s+in|from|near|living\s+in|located\s+in)\s*$", re.I)
+# Phrasing the rules can't decompose ("the person behind X", "links between X and Y")
+COMPLEX_CUE = re.compile(r"\?|\b(?:who|whom|which|whether|that|why|how|behind|linked|connected|between|and|or)\b", re.I)
+LEADING_PROPER_NOUNS = re.compile(r"[A-Z][\w'.-]*(?:\s+[A-Z][\w'.-]*)*")
+WORD = re.compile(r"[A-Za-z][\w'-]*")
+
+STOPWORDS = {
+    "a", "an", "the", "at", "in", "of", "for", "with", "from", "by", "on", "about", "as", "is", "to",
+    "works", "working", "worked", "based", "currently", "formerly", "employed", "joined", "near", "living",
+    "located", "his", "her", "their", "its", "known", "also", "previously",
+}
+# Titles read as part of the role rather than as unexplained names
+TITLES = {
+    "ceo", "cto", "cfo", "coo", "cio", "vp", "svp", "evp", "md", "phd", "dr", "prof", "professor", "founder",
+    "co-founder", "cofounder", "director", "chairman", "chairwoman", "president", "partner", "head", "lead",
+}
+DEFAULT_KEYWORDS = {
+    "person": ["career", "business", "news", "legal"],
+    "organization": ["ownership", "business", "news", "legal"],
+}
+
+
+def _ent(ent) -> Dict:
+    return {"text": ent.text.strip(" ,."), "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+
+
+def _cued(entities: List[Dict], text: str, cue: re.Pattern) -> Optional[Dict]:
+    """Return the first entity introduced by ``cue`` (e.g. "at Acme"), else the first entity."""
+    for ent in entities:
+        if cue.search(text[:ent["start"]]):
+            return ent
+    return entities[0] if entities else None
+
+
+def local_parse(query: str) -> Tuple[Dict, float]:
+    """Return the parsed fields and a 0–1 confidence that they match what the LLM would extract."""
+    text = LEAD_IN.sub("", query.strip(), count=1).strip().rstrip(".")
+    if not text:
+        return {}, 0.0
+    entities = [_ent(e) for e in get_nlp()(text).ents]
+    people = [e for e in entities if e["label"] == "PERSON"]
+    orgs = [e for e in entities if e["label"] == "ORG"]
+    confidence = 1.0
+
+    # Subject: the first person or organization mentioned, else the leading proper-noun span
+    candidates = sorted(people + orgs, key=lambda e: e["start"])
+    if candidates:
+        subject = candidates[0]
+    else:
+        match = LEADING_PROPER_NOUNS.match(text)
+        if not match:
+            return {}, 0.0
+        subject = {"text": match.group(0), "label": "", "start": 0, "end": match.end()}
+        confidence -= 0.4
+
+    if ORG_SUFFIX.search(subject["text"]) or subject["label"] == "ORG":
+        entity_type = "organization"
+    else:
+        entity_type = "person"
+        if subject["label"] != "PERSON":
+            confidence -= 0.1
+    # Another person, or a person after an organization subject, means the subject is unclear
+    if len(people) > 1 or (subject["label"] == "ORG" and people):
+        confidence -= 0.3
+
+    # A fallback subject can contain entities ("Berlin Startup Hub"); those belong to the name
+    others = [e for e in entities if e["end"] <= subject["start"] or e["start"] >= subject["end"]]
+    after = [e for e in others if e["start"] >= subject["end"]]
+    affiliation = _cued([e for e in after if e["label"] == "ORG"], text, AFFILIATION_CUE)
+    location = _cued([e for e in others if e["label"] in ("GPE", "LOC", "FAC")], text, LOCATION_CUE)
+    nationality = next((e for e in others if e["label"] == "NORP"), None)
+
+    # Whatever the fields don't cover should be a role or topic description
+    remainder = text
+    for ent in sorted(filter(None, [subject, affiliation, location, nationality]), key=lambda e: -e["start"]):
+        remainder = remainder[:ent["start"]] + " " + remainder[ent["end"]:]
+    content = [w for w in WORD.findall(remainder) if w.lower() not in STOPWORDS]
+    unexplained = [w for w in content if w[0].isupper() and w.lower() not in TITLES]
+    confidence -= 0.15 * len(unexplained)
+    confidence -= 0.25 * len(COMPLEX_CUE.findall(remainder))
+    if len(content) > 6:
+        confidence -= 0.2
+
+    role = " ".join(w.lower() for w in content if w not in unexplained)
+    keywords = []
+    for keyword in [role, affiliation and affiliation["text"], location and location["text"], *DEFAULT_KEYWORDS[entity_type]]:
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+
+    parsed = {
+        "entity_type": entity_type,
+        "entity_name": subject["text"],
+        "keywords": keywords[:6],
+        "affiliation": affiliation["text"] if affiliation else "",
+        "location": location["text"] if location else "",
+        "nationality": nationality["text"] if nationality else "",
+    }
+    return parsed, max(0.0, round(confidence, 3))
@@ -0,0 +1,101 @@
+# src/agent/agents/parse_plan_agent.py
+
+import asyncio
+import logging
+from typing import List, Tuple
+
+from agent.agents.planner_agent import PLANNER_GUIDANCE, PLANNER_MODEL, validate_tasks
+from agent.agents.query_parser_agent import PARSER_FIELDS, confident_local_parse, llm_query_parser
+from agent.providers import anthropic_messages, cached_system, tool_input
+from agent.scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+PARSE_PLAN_SYSTEM = f"""You are an OSINT query parser and task planner.
+
+For the natural language query you are given, extract structured metadata about the entity and generate 8 **web-searchable** investigation tasks for it. Record both with the record_parse_and_plan tool.
+
+"parsed" fields:
+{PARSER_FIELDS}
+
+"tasks": 8 investigation tasks for the entity.
+{PLANNER_GUIDANCE}
+
+For example:
+{{
+  "parsed": {{
+    "entity_type": "person",
+    "entity_name": "Muhammad Aqib Iqbal",
+    "keywords": ["AI", "Turing", "LinkedIn", "Oman"],
+    "affiliation": "Turing",
+    "location": "Oman",
+    "nationality": "Pakistani"
+  }},
+  "tasks": [
+    "Search LinkedIn for current role of Muhammad Aqib Iqbal at Turing",
+    "Check Oman business registries for companies linked to Muhammad Aqib Iqbal",
+    ...
+  ]
+}}"""
+
+# Tool use makes the reply structured: the model fills this schema instead of writing JSON text
+PARSE_PLAN_TOOL = {
+    "name": "record_parse_and_plan",
+    "description": "Record the parsed entity metadata and its investigation tasks.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "parsed": {
+                "type": "object",
+                "properties": {
+                    "entity_type": {"type": "string", "enum": ["person", "organization"]},
+                    "entity_name": {"type": "string"},
+                    "keywords": {"type": "array", "items": {"type": "string"}},
+                    "affiliation": {"type": "string"},
+                    "location": {"type": "string"},
+                    "nationality": {"type": "string"},
+                },
+                "required": ["entity_type", "entity_name", "keywords"],
+            },
+            "tasks": {"type": "array", "items": {"type": "string"}, "minItems": 1, "maxItems": 8},
+        },
+        "required": ["parsed", "tasks"],
+    },
+}
+
+async def parse_and_plan_agent(query: str) -> Tuple[dict, List[str]]:
+    """Parse ``query`` and plan its tasks in one LLM call instead of two.
+
+    A confident local parse comes back without tasks, as does a fused reply whose
+    tasks are unusable; the Planner node then plans them as usual.
+    """
+    local = await asyncio.to_thread(confident_local_parse, query)
+    if local is not None:
+        logger.info("⚡ Parsed locally (confidence %.2f)", local["parse_confidence"])
+        return local, []
+
+    response = await get_scheduler("anthropic", PLANNER_MODEL).run(
+        lambda: anthropic_messages(
+            "parse_and_plan",
+            model=PLANNER_MODEL,
+            max_tokens=1200,
+            temperature=0.2,
+            system=cached_system(PARSE_PLAN_SYSTEM, PLANNER_MODEL),
+            tools=[PARSE_PLAN_TOOL],
+            tool_choice={"type": "tool", "name": PARSE_PLAN_TOOL["name"]},
+            messages=[{"role": "user", "content": f'Query: "{query}"'}]
+        )
+    )
+    try:
+        result = tool_input(response, PARSE_PLAN_TOOL["name"])
+        parsed = result["parsed"]
+        if not isinstance(parsed, dict) or not parsed.get("entity_name"):
+            raise ValueError("missing parsed entity")
+    except Exception as e:
+        logger.warning("⚠️ Fused parse-and-plan reply unusable, parsing separately: %s", e)
+        return await llm_query_parser(query), []
+    try:
+        return parsed, validate_tasks(result.get("tasks"))[:8]
+    except ValueError as e:
+        logger.warning("⚠️ Fused reply had no usable tasks, planning separately: %s", e)
+        return parsed, []
@@ -1,49 +1,186 @@
 #backend/src/agent/agents/planner_agent.py
 
+import ast
+import asyncio
+import json
 import os
+from typing import List
 from dotenv import load_dotenv
-from anthropic import Anthropic
 
-load_dotenv()
+from agent.providers import anthropic_messages, cached_system
+from agent.scheduler import get_scheduler
+from agent.agents.query_parser_agent import extract_json
 
-client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+load_dotenv()
 
-def planner_agent(entity_type: str, entity_name: str, keywords: list, affiliation: str, location: str) -> list:
-    prompt = f"""
-You are an OSINT task planner.
+PLANNER_MODEL = "claude-3-5-haiku-20241022"
+# "llm": one planner call per entity; "fused": tasks come from the query parser's
+# call (see parse_plan_agent); "template": fixed screening tasks, no LLM at all
+PLANNER_MODE = os.getenv("OSINT_PLANNER_MODE", "llm")
 
-Generate 8 **web-searchable** investigation tasks for:
-- Entity: {entity_name} ({entity_type})
-- Keywords: {', '.join(keywords)}
-- Affiliation: {affiliation}
-- Location: {location}
-
-Include diverse areas like:
-- LinkedIn role at {affiliation}
-- Local {location} registries or residency databases
-- News/media mentions in {location}
+# Static instructions; the entities go in the user message
+PLANNER_GUIDANCE = """Include diverse areas like:
+- LinkedIn role at the entity's affiliation
+- Local registries or residency databases for the entity's location
+- News/media mentions in that location
 - Career, business, legal, financial, academic, social presence
 
 Keep each task:
 - Specific
 - Actionable
 - Factual
-- Likely to yield results online
+- Likely to yield results online"""
+
+PLANNER_SYSTEM = f"""You are an OSINT task planner.
+
+Generate 8 **web-searchable** investigation tasks for the entity you are given.
+
+{PLANNER_GUIDANCE}
 
 Respond ONLY with a JSON array of strings:
 [
-  "Search LinkedIn for current role of {entity_name} at {affiliation}",
-  "Check {location} business registries for companies linked to {entity_name}",
+  "Search LinkedIn for current role of <entity> at <affiliation>",
+  "Check <location> business registries for companies linked to <entity>",
   ...
-]
-"""
-
-    response = client.messages.create(
-        model="claude-3-5-haiku-20241022",
-        max_tokens=1000,
-        temperature=0.2,
-        messages=[{"role": "user", "content": prompt}]
+]"""
+
+BATCH_PLANNER_SYSTEM = f"""You are an OSINT task planner.
+
+Generate 8 **web-searchable** investigation tasks for each numbered entity you are given.
+
+{PLANNER_GUIDANCE}
+
+Respond ONLY with a JSON array containing one array of 8 task strings per entity, in the same order:
+[
+  ["Search LinkedIn for current role of <entity 1> at <affiliation>", ...],
+  ["Check <location> business registries for companies linked to <entity 2>", ...]
+]"""
+
+def validate_tasks(tasks) -> List[str]:
+    if isinstance(tasks, dict) and "tasks" in tasks:
+        tasks = tasks["tasks"]
+    if not isinstance(tasks, list) or not tasks or not all(isinstance(t, str) and t.strip() for t in tasks):
+        raise ValueError(f"Expected a JSON array of task strings, got: {str(tasks)[:200]}")
+    return [t.strip() for t in tasks]
+
+def parse_task_list(text: str) -> List[str]:
+    """Parse a planner reply into task strings without ever evaluating it as code.
+
+    Any prose around the list is ignored. Raises ValueError when no task list can be read.
+    """
+    # The first JSON task list in the reply, even if the prose around it has brackets too
+    decoder = json.JSONDecoder()
+    for start in (i for i, ch in enumerate(text) if ch == "["):
+        try:
+            return validate_tasks(decoder.raw_decode(text, start)[0])
+        except ValueError:
+            continue
+
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end < start:
+        raise ValueError(f"No task list in planner reply: {text[:200]}")
+    span = text[start:end + 1]
+    try:
+        tasks = json.loads(span)
+    except json.JSONDecodeError:
+        try:
+            # Python-style lists (single quotes) are plain literals; literal_eval accepts nothing else
+            tasks = ast.literal_eval(span)
+        except (SyntaxError, ValueError) as e:
+            raise ValueError(f"Unreadable task list in planner reply: {e}") from e
+    return validate_tasks(tasks)
+
+def template_plan(entity_type: str, entity_name: str, affiliation: str = "", location: str = "") -> List[str]:
+    """Deterministic standard-screening tasks built from the parsed fields."""
+    at = f" at {affiliation}" if affiliation else ""
+    in_location = f" in {location}" if location else ""
+    registries = f"{location} business registries" if location else "business registries"
+    if entity_type == "organization":
+        return [
+            f"Search {registries} for the registration, officers and ownership of {entity_name}",
+            f"Find the leadership team and board members of {entity_name}",
+            f"Find news and media mentions of {entity_name}{in_location}",
+            f"Search court records, regulatory actions and sanctions lists mentioning {entity_name}",
+            f"Search financial filings, funding rounds and annual reports of {entity_name}",
+            f"Identify subsidiaries, parent companies and major shareholders of {entity_name}",
+            f"Check the official website, domain records and social media accounts of {entity_name}",
+            f"Check the relationship between {entity_name} and {affiliation}" if affiliation
+            else f"Find customer complaints, reviews and controversies involving {entity_name}",
+        ]
+    return [
+        f"Search LinkedIn for current role of {entity_name}{at}",
+        f"Check {registries} for companies linked to {entity_name}",
+        f"Find news and media mentions of {entity_name}{in_location}",
+        f"Search court records, sanctions lists and legal filings mentioning {entity_name}",
+        f"Find academic publications, patents or conference talks by {entity_name}",
+        f"Check social media presence and public profiles of {entity_name}",
+        f"Search financial filings, directorships and shareholdings of {entity_name}",
+        f"Verify {entity_name}'s role at {affiliation} on the official {affiliation} website" if affiliation
+        else f"Find interviews, biographies or profiles of {entity_name}",
+    ]
+
+async def planner_agent(entity_type: str, entity_name: str, keywords: list, affiliation: str, location: str) -> list:
+    if PLANNER_MODE == "template":
+        return template_plan(entity_type, entity_name, affiliation, location)
+
+    prompt = f"""- Entity: {entity_name} ({entity_type})
+- Keywords: {', '.join(keywords)}
+- Affiliation: {affiliation}
+- Location: {location}"""
+
+    response = await get_scheduler("anthropic", PLANNER_MODEL).run(
+        lambda: anthropic_messages(
+            "planner",
+            model=PLANNER_MODEL,
+            max_tokens=1000,
+            temperature=0.2,
+            system=cached_system(PLANNER_SYSTEM, PLANNER_MODEL),
+            messages=[{"role": "user", "content": prompt}]
+        )
+    )
+    try:
+        return parse_task_list(response.content[0].text)[:8]
+    except ValueError as e:
+        print(f"⚠️ Planner reply unusable, using template tasks: {e}")
+        return template_plan(entity_type, entity_name, affiliation, location)
+
+async def batch_planner_agent(entities: list) -> list:
+    """Plans tasks for several parsed entities in one call; falls back to one call per entity if the batch reply is unusable."""
+    if PLANNER_MODE == "template":
+        return [
+            template_plan(e.get("entity_type", ""), e.get("entity_name", ""), e.get("affiliation", ""), e.get("location", ""))
+            for e in entities
+        ]
+    described = "\n".join(
+        f"{i}. {e.get('entity_name', '')} ({e.get('entity_type', '')}); keywords: {', '.join(e.get('keywords', []))}; "
+        f"affiliation: {e.get('affiliation', '')}; location: {e.get('location', '')}"
+        for i, e in enumerate(entities, 1)
     )
-    raw = response.content[0].text.strip().strip("```json").strip("```")
-    tasks = eval(raw)
-    return tasks[:8]
+    prompt = f"Entities:\n{described}"
+    try:
+        response = await get_scheduler("anthropic", PLANNER_MODEL).run(
+            lambda: anthropic_messages(
+                "batch_planner",
+                model=PLANNER_MODEL,
+                max_tokens=1000 * len(entities),
+                temperature=0.2,
+                system=cached_system(BATCH_PLANNER_SYSTEM, PLANNER_MODEL),
+                messages=[{"role": "user", "content": prompt}]
+            )
+        )
+        plans = extract_json(response.content[0].text.strip())
+        if isinstance(plans, list) and len(plans) == len(entities):
+            return [validate_tasks(p)[:8] for p in plans]
+        print(f"⚠️ Batch plan returned {len(plans) if isinstance(plans, list) else 'no'} plans for {len(entities)} entities")
+    except Exception as e:
+        print(f"⚠️ Batch plan failed: {e}")
+    return list(await asyncio.gather(*[
+        planner_agent(
+            e.get("entity_type", ""),
+            e.get("entity_name", ""),
+            e.get("keywords", ""),
+            e.get("affiliation", ""),
+            e.get("location", ""),
+        )
+        for e in entities
+    ]))
@@ -1,30 +1,36 @@
 #backend/src/agent/agents/query_parser_agent
-import os
 from dotenv import load_dotenv
-from anthropic import Anthropic
+from typing import Optional
 import json
+import os
+import asyncio
 
-load_dotenv()
-
-client = Anthropic(
-    api_key=os.getenv("ANTHROPIC_API_KEY")
-)
+from agent.agents.local_query_parser import local_parse
+from agent.providers import anthropic_messages, cached_system
+from agent.scheduler import get_scheduler
 
-def query_parser_agent(query: str) -> dict:
-    prompt = f"""
-You are an OSINT query parser.
+load_dotenv()
 
-Extract structured metadata from the natural language query below. Output only a **valid JSON object**.
+QUERY_PARSER_MODEL = "claude-3-5-haiku-20241022"
+# Queries the local spaCy + rules parser handles at this confidence or above skip the LLM
+LOCAL_PARSER_ENABLED = os.getenv("OSINT_LOCAL_PARSER", "1") == "1"
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv("OSINT_LOCAL_PARSER_MIN_CONFIDENCE", "0.75"))
 
-Required fields:
-- "entity_type": "person" or "organization"
+# Static instructions go in the system prompt, ahead of anything per-request.
+# They are shorter than Haiku's cache minimum, so cached_system sends them uncached
+PARSER_FIELDS = """- "entity_type": "person" or "organization"
 - "entity_name": full name of person or org
 - "keywords": important investigation topics (list of 3–6 strings)
 - "affiliation": known workplace or organization (if any)
 - "location": primary place of activity or residence
-- "nationality": if stated clearly
+- "nationality": if stated clearly"""
 
-Query: "{query}"
+QUERY_PARSER_SYSTEM = f"""You are an OSINT query parser.
+
+Extract structured metadata from the natural language query you are given. Output only a **valid JSON object**.
+
+Required fields:
+{PARSER_FIELDS}
 
 Respond ONLY with JSON like:
 {{
@@ -34,16 +40,28 @@ Respond ONLY with JSON like:
   "affiliation": "Turing",
   "location": "Oman",
   "nationality": "Pakistani"
-}}
-"""
-    response = client.messages.create(
-        model="claude-3-5-haiku-20241022",
-        max_tokens=200,
-        temperature=0.2,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    text = response.content[0].text.strip()
+}}"""
+
+BATCH_QUERY_PARSER_SYSTEM = f"""You are an OSINT query parser.
 
+Extract structured metadata from each numbered natural language query you are given. Output only a **valid JSON array** with one object per query, in the same order.
+
+Required fields for each object:
+{PARSER_FIELDS}
+
+Respond ONLY with a JSON array like:
+[
+  {{
+    "entity_type": "person",
+    "entity_name": "Muhammad Aqib Iqbal",
+    "keywords": ["AI", "Turing", "LinkedIn", "Oman"],
+    "affiliation": "Turing",
+    "location": "Oman",
+    "nationality": "Pakistani"
+  }}
+]"""
+
+def extract_json(text: str):
     try:
         # Try loading directly
         return json.loads(text)
@@ -59,3 +77,71 @@ Respond ONLY with JSON like:
             except json.JSONDecodeError:
                 continue
         raise ValueError(f"❌ Failed to parse structured JSON from Claude:\n{text}")
+
+def confident_local_parse(query: str) -> Optional[dict]:
+    """Return the local parse of ``query``, or None when it is disabled or not confident enough."""
+    if not LOCAL_PARSER_ENABLED:
+        return None
+    try:
+        parsed, confidence = local_parse(query)
+    except Exception as e:
+        # e.g. the spaCy model isn't installed; the LLM parser still works
+        print(f"⚠️ Local query parser failed, using the LLM: {e}")
+        return None
+    if confidence < LOCAL_PARSER_MIN_CONFIDENCE:
+        return None
+    return {**parsed, "parse_confidence": confidence}
+
+async def query_parser_agent(query: str) -> dict:
+    local = await asyncio.to_thread(confident_local_parse, query)
+    if local is not None:
+        print(f"⚡ Parsed locally (confidence {local['parse_confidence']:.2f})")
+        return local
+    return await llm_query_parser(query)
+
+async def llm_query_parser(query: str) -> dict:
+    prompt = f'Query: "{query}"'
+    response = await get_scheduler("anthropic", QUERY_PARSER_MODEL).run(
+        lambda: anthropic_messages(
+            "query_parser",
+            model=QUERY_PARSER_MODEL,
+            max_tokens=200,
+            temperature=0.2,
+            system=cached_system(QUERY_PARSER_SYSTEM, QUERY_PARSER_MODEL),
+            messages=[{"role": "user", "content": prompt}]
+        )
+    )
+    text = response.content[0].text.strip()
+    return extract_json(text)
+
+async def batch_query_parser_agent(queries: list) -> list:
+    """Parse several queries, locally where the rules are confident and in one LLM call for the rest."""
+    parsed = await asyncio.to_thread(lambda: [confident_local_parse(q) for q in queries])
+    pending = [i for i, p in enumerate(parsed) if p is None]
+    if pending:
+        for i, p in zip(pending, await batch_llm_query_parser([queries[i] for i in pending])):
+            parsed[i] = p
+    return parsed
+
+async def batch_llm_query_parser(queries: list) -> list:
+    """Parse several queries in one LLM call, falling back to one call per query if the batch reply is unusable."""
+    numbered = "\n".join(f'{i}. "{q}"' for i, q in enumerate(queries, 1))
+    prompt = f"Queries:\n{numbered}"
+    try:
+        response = await get_scheduler("anthropic", QUERY_PARSER_MODEL).run(
+            lambda: anthropic_messages(
+                "batch_query_parser",
+                model=QUERY_PARSER_MODEL,
+                max_tokens=200 * len(queries),
+                temperature=0.2,
+                system=cached_system(BATCH_QUERY_PARSER_SYSTEM, QUERY_PARSER_MODEL),
+                messages=[{"role": "user", "content": prompt}]
+            )
+        )
+        parsed = extract_json(response.content[0].text.strip())
+        if isinstance(parsed, list) and len(parsed) == len(queries) and all(isinstance(p, dict) for p in parsed):
+            return parsed
+        print(f"⚠️ Batch parse returned {len(parsed) if isinstance(parsed, list) else 'no'} items for {len(queries)} queries")
+    except Exception as e:
+        print(f"⚠️ Batch parse failed: {e}")
+    return list(await asyncio.gather(*[llm_query_parser(q) for q in queries]))
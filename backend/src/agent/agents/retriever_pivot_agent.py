@@ -1,14 +1,28 @@
 import os
 import hashlib
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import Callable, Iterable, List, Dict, Optional
 
 import asyncio
-from openai import AsyncOpenAI
+
+from agent.metrics import record_cache_lookup, record_retry
+from agent.providers import openai_chat
+from agent.scheduler import get_scheduler, is_rate_limited, is_transient
+from agent.search_cache import get_search_cache, make_cache_key
 
 load_dotenv()
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "1") == "1"
+# Cached results are served only while their decayed score stays above this floor
+SEARCH_CACHE_MIN_SCORE = float(os.getenv("SEARCH_CACHE_MIN_SCORE", "0.5"))
+
+SEARCH_MAX_ATTEMPTS = int(os.getenv("SEARCH_MAX_ATTEMPTS", "3"))
+SEARCH_BACKOFF_BASE = float(os.getenv("SEARCH_BACKOFF_BASE", "1.0"))
+# Results below this confidence are re-issued on the next retriever pass
+RETRIEVAL_CONFIDENCE_FLOOR = 0.5
+ERROR_CONFIDENCE = 0.2
 
 # --- Scoring Functions ---
 
@@ -35,12 +49,101 @@ def compute_decay_score(published_date: str, base_confidence: float) -> float:
 def hash_text(text: str) -> str:
     return hashlib.sha256(text.encode()).hexdigest()
 
+def cache_ttl_days(base_confidence: float, min_score: float = SEARCH_CACHE_MIN_SCORE) -> int:
+    # Number of whole days a result stays above min_score under compute_decay_score
+    now = datetime.now()
+    days = 0
+    while days < 365:
+        published = (now - timedelta(days=days + 1)).strftime("%Y-%m-%d")
+        if compute_decay_score(published, base_confidence) < min_score:
+            break
+        days += 1
+    return days
+
+# --- Search Cache ---
+
+def get_cached_search(task: str, entity_name: str, i: int, model_name: str) -> Dict | None:
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    cached = get_search_cache().get(make_cache_key(task, entity_name, model_name))
+    record_cache_lookup(cached is not None)
+    if cached is None:
+        return None
+    print(f"⚡ Cache hit for task {i}: {task}")
+    cached["query_used"] = task
+    cached["decayed_score"] = compute_decay_score(cached.get("published", ""), cached.get("confidence", 0.0))
+    cached["cache_hit"] = True
+    return {f"task_{i}": cached}
+
+def store_cached_search(task: str, entity_name: str, model_name: str, result: Dict):
+    if not SEARCH_CACHE_ENABLED:
+        return
+    # Low-confidence and error results decay below the floor immediately and are never stored
+    ttl_days = cache_ttl_days(result.get("confidence", 0.0))
+    get_search_cache().put(make_cache_key(task, entity_name, model_name), result, ttl_seconds=ttl_days * 86400)
+
+# --- Retry Policy ---
+
+def backoff_delay(attempt: int) -> float:
+    # Exponential backoff with full jitter, as in the provider scheduler
+    return random.uniform(0, SEARCH_BACKOFF_BASE * (2 ** (attempt - 1)))
+
+def is_failed(result: Optional[Dict]) -> bool:
+    return result is None or bool(result.get("failed"))
+
+def is_permanent_failure(result: Optional[Dict]) -> bool:
+    # Bad requests, auth and permission errors would fail the same way on another pass
+    return result is not None and bool(result.get("failed")) and not result.get("transient", True)
+
+def needs_retry(result: Optional[Dict]) -> bool:
+    return is_failed(result) or float(result.get("confidence", 0)) < RETRIEVAL_CONFIDENCE_FLOOR
+
+def reformulate_task(task: str, entity_name: str) -> str:
+    # Low-confidence answers usually mean the query was too narrow or ambiguous
+    return (
+        f"{task}. If nothing matches exactly, broaden to reputable news, official registries "
+        f"and professional profiles that mention {entity_name}, and state what was found"
+    )
+
 # --- Async Web Search Task ---
 
-async def run_web_search(task: str, entity_name: str, i: int, model_name: str) -> Dict:
-    try:
-        print(f"🔎 Running web search for task {i}: {task}")
-        response = await client.chat.completions.create(
+def search_result(task: str, content: str, urls: List[Dict]) -> Dict:
+    base_conf = estimate_confidence(content)
+    now = datetime.now()
+    publish_date = now.strftime("%Y-%m-%d")
+    return {
+        "source": "web_search_preview",
+        "query_used": task,
+        "published": publish_date,
+        "retrieved": now.isoformat(),
+        "data": content,
+        "confidence": base_conf,
+        "decayed_score": compute_decay_score(publish_date, base_conf),
+        "hash": hash_text(content),
+        "citations": urls
+    }
+
+def error_result(task: str, errors: List[str], transient: bool) -> Dict:
+    return {
+        "source": "web_search_preview",
+        "query_used": task,
+        "retrieved": datetime.now().isoformat(),
+        "confidence": ERROR_CONFIDENCE,
+        "decayed_score": compute_decay_score(datetime.now().strftime("%Y-%m-%d"), ERROR_CONFIDENCE),
+        "data": f"Error: {errors[-1]}",
+        "hash": hash_text(errors[-1]),
+        "citations": [],
+        "failed": True,
+        "errors": errors,
+        # Whether the last error may clear up on a later pass (timeouts, 5xx, 429)
+        "transient": transient,
+    }
+
+async def search_once(task: str, entity_name: str, model_name: str) -> Dict:
+    # All fan-out goes through the shared per-model scheduler, which rate-limits and retries 429s
+    response = await get_scheduler("openai", model_name).run(
+        lambda: openai_chat(
+            "web_search",
             model=model_name,
             web_search_options={},
             messages=[
@@ -53,65 +156,91 @@ Task: {task} about {entity_name}. Provide a brief summary and cite sources.
                 }
             ]
         )
+    )
 
-        message = response.choices[0].message
-        content = message.content if isinstance(message.content, str) else str(message.content)
-
-        urls = []
-        if hasattr(message, "annotations"):
-            for ann in message.annotations:
-                if getattr(ann, "type", "") == "url_citation" and hasattr(ann, "url_citation") and len(urls) < 2:
-                    citation = ann.url_citation
-                    urls.append({
-                        "url": citation.url,
-                        "title": getattr(citation, "title", ""),
-                        "start": getattr(citation, "start_index", None),
-                        "end": getattr(citation, "end_index", None)
-                    })
-
-        base_conf = estimate_confidence(content)
-        now = datetime.now()
-        publish_date = now.strftime("%Y-%m-%d")
-        decayed = compute_decay_score(publish_date, base_conf)
-
-        return {
-            f"task_{i}": {
-                "source": "web_search_preview",
-                "query_used": task,
-                "published": publish_date,
-                "retrieved": now.isoformat(),
-                "data": content,
-                "confidence": base_conf,
-                "decayed_score": decayed,
-                "hash": hash_text(content),
-                "citations": urls
-            }
-        }
-
-    except Exception as e:
-        print(f"⚠️ Error in task {i}: {e}")
-        return {
-            f"task_{i}": {
-                "source": "web_search_preview",
-                "query_used": task,
-                "retrieved": datetime.now().isoformat(),
-                "confidence": 0.2,
-                "decayed_score": compute_decay_score(datetime.now().strftime("%Y-%m-%d"), 0.2),
-                "data": f"Error: {str(e)}",
-                "hash": hash_text(str(e)),
-                "citations": []
-            }
-        }
+    message = response.choices[0].message
+    content = message.content if isinstance(message.content, str) else str(message.content)
 
-# --- Parallel Retriever Agent ---
+    urls = []
+    if hasattr(message, "annotations"):
+        for ann in message.annotations:
+            if getattr(ann, "type", "") == "url_citation" and hasattr(ann, "url_citation") and len(urls) < 2:
+                citation = ann.url_citation
+                urls.append({
+                    "url": citation.url,
+                    "title": getattr(citation, "title", ""),
+                    "start": getattr(citation, "start_index", None),
+                    "end": getattr(citation, "end_index", None)
+                })
+
+    return search_result(task, content, urls)
 
-def retriever_pivot_agent(tasks: List[str], entity_name: str, model_name: str = "gpt-4o-mini-search-preview") -> Dict[str, Dict]:
-    async def gather_tasks():
-        calls = [run_web_search(task, entity_name, i+1, model_name) for i, task in enumerate(tasks)]
-        results = await asyncio.gather(*calls)
-        merged = {}
-        for r in results:
-            merged.update(r)
-        return merged
+async def run_web_search(task: str, entity_name: str, i: int, model_name: str) -> Dict:
+    cached = get_cached_search(task, entity_name, i, model_name)
+    if cached is not None:
+        return cached
+
+    # Provider errors are retried per task with backoff instead of failing the whole pass
+    errors = []
+    transient = True
+    for attempt in range(1, SEARCH_MAX_ATTEMPTS + 1):
+        try:
+            print(f"🔎 Running web search for task {i} (attempt {attempt}): {task}")
+            result = await search_once(task, entity_name, model_name)
+            if errors:
+                result["errors"] = errors
+            result["attempts"] = attempt
+            store_cached_search(task, entity_name, model_name, result)
+            return {f"task_{i}": result}
+        except Exception as e:
+            print(f"⚠️ Error in task {i} (attempt {attempt}): {e}")
+            errors.append(str(e))
+            transient = is_transient(e)
+            if is_rate_limited(e):
+                # The scheduler has already backed off on this; leave it to the next pass
+                break
+            if not transient:
+                # Bad requests, auth and permission errors fail the same way every time
+                break
+            if attempt < SEARCH_MAX_ATTEMPTS:
+                record_retry("search")
+                await asyncio.sleep(backoff_delay(attempt))
+
+    result = error_result(task, errors, transient)
+    result["attempts"] = len(errors)
+    return {f"task_{i}": result}
+
+# --- Parallel Retriever Agent ---
 
-    return asyncio.run(gather_tasks())
+async def retriever_pivot_agent(
+    tasks: List[str],
+    entity_name: str,
+    model_name: str = "gpt-4o-mini-search-preview",
+    on_result: Optional[Callable[[Dict], None]] = None,
+    task_numbers: Optional[Iterable[int]] = None,
+    reformulate: Iterable[int] = (),
+) -> Dict[str, Dict]:
+    """Run web searches for the given tasks concurrently.
+
+    ``task_numbers`` (1-based) limits the run to a subset of tasks so a retry only
+    re-issues what failed; keys stay ``task_<n>`` so results merge with earlier
+    passes. Tasks listed in ``reformulate`` are sent with a broadened query.
+    """
+    reformulate = set(reformulate)
+    numbers = list(task_numbers) if task_numbers is not None else range(1, len(tasks) + 1)
+
+    async def run_and_report(i: int) -> Dict:
+        task = tasks[i - 1]
+        if i in reformulate:
+            task = reformulate_task(task, entity_name)
+        result = await run_web_search(task, entity_name, i, model_name)
+        # Report each retrieval as soon as it lands, not when the slowest one finishes
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    results = await asyncio.gather(*[run_and_report(i) for i in numbers])
+    merged = {}
+    for r in results:
+        merged.update(r)
+    return merged
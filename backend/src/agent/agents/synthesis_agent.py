@@ -1,15 +1,56 @@
-import os
-import time
+import asyncio
 from datetime import datetime
 from dotenv import load_dotenv
-import google.generativeai as genai
 from collections import defaultdict
 
+from agent.providers import gemini_generate
+from agent.scheduler import get_scheduler
+
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-def synthesis_agent(retrievals: dict, entity_name: str, model_name: str = "gemini-2.0-flash") -> str:
-    model = genai.GenerativeModel(model_name)
+SYNTHESIS_INSTRUCTIONS = """You are an elite OSINT synthesis agent.
+
+Use only the curated summaries and citations given after these instructions to write an intelligence report on the subject named there. Do not fabricate or speculate. Only base your report on what’s provided.
+
+Each task includes:
+- A short summary
+- Confidence & decay scores
+- Timestamps
+- Citations (if any)
+
+Write the report in this structure, using the subject's name and the report date given below:
+
+## OSINT Intelligence Report: <subject>
+
+**Report Date:** <report date>
+
+### Executive Summary
+Write 2–3 sentences summarizing who this is, what they're involved in, and any risks.
+
+### Key Intelligence by Category
+
+**1. Career / Employment**
+- Mention jobs, affiliations, and roles.
+
+**2. Financial / Corporate Ties**
+- Business interests, assets, ownerships.
+
+**3. Legal / Regulatory Issues**
+- Any sanctions, legal mentions, or red flags.
+
+**4. Academic / Public Presence**
+- Degrees, publications, public appearances.
+
+**5. Online / Social Media**
+- Platforms, interviews, online influence.
+
+**6. Additional Observations**
+- Anything extra that stands out.
+
+### Risk Score
+Based on the evidence, estimate the subject’s reputational risk profile."""
+
+async def synthesis_agent(retrievals: dict, entity_name: str, model_name: str = "gemini-2.0-flash") -> str:
     today = datetime.now().strftime("%B %d, %Y")
 
     # Reduce prompt size for better performance
@@ -38,10 +79,11 @@ def synthesis_agent(retrievals: dict, entity_name: str, model_name: str = "gemin
     ])
 
     # Citations section
-    citation_set = set()
+    # Ordered, so the prompt (and its replay key) is the same on every run
+    citation_set = {}
     for r in top_results:
         for c in r.get("citations", []):
-            citation_set.add((c["url"], c.get("title", "")))
+            citation_set[(c["url"], c.get("title", ""))] = None
 
     citation_list = list(citation_set)
     citation_section = "\n".join([
@@ -66,51 +108,13 @@ def synthesis_agent(retrievals: dict, entity_name: str, model_name: str = "gemin
         for task, urls in task_urls.items()
     ]) if task_urls else "No task-level URLs available."
 
-    # Final prompt
-    prompt = f"""
-You are an elite OSINT synthesis agent.
-
-Use only the curated summaries and citations below to write an intelligence report on **{entity_name}**. Do not fabricate or speculate. Only base your report on what’s provided.
-
-Each task below includes:
-- A short summary
-- Confidence & decay scores
-- Timestamps
-- Citations (if any)
+    # Static instructions first, so every synthesis prompt starts with the same prefix
+    prompt = f"""{SYNTHESIS_INSTRUCTIONS}
 
 ---
 
-## OSINT Intelligence Report: {entity_name}
-
-**Report Date:** {today}
-
-### Executive Summary
-Write 2–3 sentences summarizing who this is, what they're involved in, and any risks.
-
-### Key Intelligence by Category
-
-**1. Career / Employment**
-- Mention jobs, affiliations, and roles.
-
-**2. Financial / Corporate Ties**
-- Business interests, assets, ownerships.
-
-**3. Legal / Regulatory Issues**
-- Any sanctions, legal mentions, or red flags.
-
-**4. Academic / Public Presence**
-- Degrees, publications, public appearances.
-
-**5. Online / Social Media**
-- Platforms, interviews, online influence.
-
-**6. Additional Observations**
-- Anything extra that stands out.
-
-### Risk Score
-Based on the evidence, estimate the subject’s reputational risk profile.
-
----
+Subject: **{entity_name}**
+Report Date: {today}
 
 ### Task-Wise URLs (Deduplicated, Top 2 Per Task)
 {per_task_sources}
@@ -129,17 +133,21 @@ Based on the evidence, estimate the subject’s reputational risk profile.
     # Try to avoid API timeout once
     for attempt in range(2):
         try:
-            response = model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.1,
-                    "max_output_tokens": 1000
-                }
+            response = await get_scheduler("gemini", model_name).run(
+                lambda: gemini_generate(
+                    "synthesis",
+                    model_name,
+                    prompt,
+                    generation_config={
+                        "temperature": 0.1,
+                        "max_output_tokens": 1000
+                    }
+                )
             )
             return response.text
         except Exception as e:
             if "Deadline Exceeded" in str(e) and attempt == 0:
                 print("⚠️ Timeout – retrying once...")
-                time.sleep(1)
+                await asyncio.sleep(1)
             else:
                 return f"⚠️ Failed to generate synthesis: {str(e)}"
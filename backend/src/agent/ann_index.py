@@ -0,0 +1,97 @@
+# src/agent/ann_index.py
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class SimHashIndex:
+    """Random-hyperplane LSH over float16 embeddings.
+
+    Each of ``n_tables`` tables hashes a vector to ``n_bits`` sign bits, so two
+    vectors at angle θ share a bucket in one table with probability
+    (1 - θ/π) ** n_bits. Candidates from all tables are re-scored exactly, which
+    keeps memory at O(n · dim) instead of the O(n²) full similarity matrix.
+    """
+
+    def __init__(self, dim: int, n_tables: int = 16, n_bits: int = 8, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.planes = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self.vectors = np.zeros((0, dim), dtype=np.float16)
+        self.codes = np.zeros((n_tables, 0), dtype=np.int64)
+        self.buckets: List[Dict[int, np.ndarray]] = [{} for _ in range(n_tables)]
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        bits = np.einsum("tbd,nd->tnb", self.planes, vectors.astype(np.float32)) > 0
+        weights = 1 << np.arange(self.n_bits, dtype=np.int64)
+        return bits.astype(np.int64) @ weights
+
+    def build(self, vectors: np.ndarray):
+        self.vectors = vectors.astype(np.float16)
+        self.codes = self._hash(vectors)
+        for table, codes in enumerate(self.codes):
+            order = np.argsort(codes, kind="stable")
+            unique, starts = np.unique(codes[order], return_index=True)
+            for code, members in zip(unique, np.split(order, starts[1:])):
+                self.buckets[table][int(code)] = members
+
+    def near_duplicate_pairs(self, similarity_threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return unique (i, j) pairs, i < j, that share a bucket and exceed the threshold.
+
+        Each bucket is scored as one small dense block, so the work is a batch of
+        tiny matmuls rather than a gather per candidate pair.
+        """
+        n = self.vectors.shape[0]
+        keys = []
+        for table in self.buckets:
+            for members in table.values():
+                if len(members) < 2:
+                    continue
+                block = self.vectors[members].astype(np.float32)
+                a, b = np.nonzero(np.triu(block @ block.T > similarity_threshold, k=1))
+                if a.size:
+                    lo = np.minimum(members[a], members[b])
+                    hi = np.maximum(members[a], members[b])
+                    keys.append(lo * n + hi)
+        if not keys:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        keys = np.unique(np.concatenate(keys))
+        return keys // n, keys % n
+
+    def nbytes(self) -> int:
+        # Bucket member arrays hold one int64 id per vector per table, same as codes
+        return self.vectors.nbytes + self.planes.nbytes + 2 * self.codes.nbytes
+
+
+def greedy_keep_mask_ann(
+    embeddings: np.ndarray,
+    similarity_threshold: float,
+    n_tables: int = 16,
+    n_bits: int = 8,
+    seed: int = 0,
+) -> np.ndarray:
+    """Approximate version of the greedy near-duplicate filter.
+
+    Only pairs that share an LSH bucket are scored, so a true duplicate is missed
+    when it never collides with the item that should remove it.
+    """
+    n = embeddings.shape[0]
+    keep = np.ones(n, dtype=bool)
+    if n == 0:
+        return keep
+
+    index = SimHashIndex(embeddings.shape[1], n_tables=n_tables, n_bits=n_bits, seed=seed)
+    index.build(embeddings)
+
+    rows, cols = index.near_duplicate_pairs(similarity_threshold)
+
+    # Same greedy walk as the exact path, over the sparse list of confirmed pairs
+    removed = np.zeros(n, dtype=bool)
+    sources, starts = np.unique(rows, return_index=True)
+    for i, targets in zip(sources, np.split(cols, starts[1:])):
+        if not removed[i]:
+            removed[targets] = True
+    return ~removed
@@ -2,20 +2,58 @@
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+import asyncio
+import logging
+import os
 import uuid
 import json
-import time
 
 from agent.chat_logger import log_session, log_message, get_chat_history, init_db
 from agent.langgraph_app import build_graph
 from agent.state import OSINTState
 from agent.audit_log import save_osint_state_to_file, load_osint_state_from_file
+from agent.search_cache import get_search_cache
+from agent.scheduler import scheduler_metrics
+from agent.metrics import render_prometheus
+from agent.coalesce import COALESCE_ENABLED, coalesce_stats, investigation_key, investigations, investigation_streams
+from agent.models import models_ready, warm_up, warmup_timings
+from agent.checkpoints import CHECKPOINTS_ENABLED, open_checkpointer, thread_config
+from agent.job_queue import JobNotOwnedError, JobQueue, QueueFullError, job_summary
+from agent.batch import investigate_batch
+from agent.profiling import profile_path, profiled, should_profile
 
-app = FastAPI()
+WARMUP_ON_STARTUP = os.getenv("OSINT_WARMUP_ON_STARTUP", "1") == "1"
+
+# Library modules (job queue, scheduler, evidence packing, ...) report through logging
+logging.basicConfig(format="%(message)s")
+logging.getLogger("agent").setLevel(os.getenv("OSINT_LOG_LEVEL", "INFO"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global graph, job_queue
+    # Models load in the background so the server accepts connections right away;
+    # /health/ready reports 503 until they are in memory.
+    warmup_task = asyncio.create_task(asyncio.to_thread(warm_up)) if WARMUP_ON_STARTUP else None
+    async with AsyncExitStack() as stack:
+        if CHECKPOINTS_ENABLED:
+            checkpointer = await stack.enter_async_context(open_checkpointer())
+            graph = build_graph(checkpointer=checkpointer)
+        # Created here rather than at import, so importing the app doesn't touch the job database
+        job_queue = JobQueue(run_job)
+        await job_queue.start()
+        stack.push_async_callback(job_queue.stop)
+        yield
+    if CHECKPOINTS_ENABLED:
+        graph = build_graph()
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +75,15 @@ class InvestigationRequest(BaseModel):
     query: str
     retrieval_model: Optional[str] = "gpt-4o-mini-search-preview"
     synthesis_model: Optional[str] = "gemini-2.0-flash"
+    profile: bool = False
+
+class BatchInvestigationRequest(BaseModel):
+    queries: List[str]
+    retrieval_model: Optional[str] = "gpt-4o-mini-search-preview"
+    synthesis_model: Optional[str] = "gemini-2.0-flash"
+
+class JobRequest(InvestigationRequest):
+    priority: int = 0
 
 def deduplicate_citations(retrievals: dict) -> list:
     seen = set()
@@ -54,21 +101,15 @@ def deduplicate_citations(retrievals: dict) -> list:
 
     return citations
 
-@app.post("/osint/investigate")
-def investigate(payload: InvestigationRequest):
-    session_id = str(uuid.uuid4())
-    state = {
-        "query": payload.query,
-        "retrieval_model": payload.retrieval_model,
-        "synthesis_model": payload.synthesis_model
-    }
+def payload_key(payload: InvestigationRequest) -> str:
+    return investigation_key(payload.query, payload.retrieval_model, payload.synthesis_model)
 
-    final_state = graph.invoke(state)
-    save_osint_state_to_file(final_state, final_state["parsed"]["entity_name"])
+def investigation_result(final_state: dict, session_id: str, profiler=None) -> dict:
+    state_path = save_osint_state_to_file(final_state, final_state["parsed"]["entity_name"])
 
     citation_urls = deduplicate_citations(final_state["retrievals"])
 
-    return {
+    result = {
         "session_id": session_id,
         "entity": final_state["parsed"]["entity_name"],
         "report": final_state["report"],
@@ -84,52 +125,276 @@ def investigate(payload: InvestigationRequest):
             "risk_signals": ["Risk assessment missing."]
         }),
     }
+    if profiler is not None:
+        result["profile"] = profiler.save(profile_path(state_path)).name
+    return result
+
+async def run_investigation(state: Optional[dict], session_id: str, profile: bool = False) -> dict:
+    """Run the graph under the session's checkpoint thread; a ``None`` state resumes it."""
+    with profiled(profile) as profiler:
+        final_state = await graph.ainvoke(state, thread_config(session_id))
+    return investigation_result(final_state, session_id, profiler)
+
+async def run_job(job: dict, on_progress) -> dict:
+    payload = job["payload"]
+    config = thread_config(job["id"])
+    state = {
+        "query": payload["query"],
+        "retrieval_model": payload["retrieval_model"],
+        "synthesis_model": payload["synthesis_model"],
+    }
+    # A job picked up again after a restart continues from its last checkpoint
+    if job["attempts"] > 1 and graph.checkpointer is not None:
+        snapshot = await graph.aget_state(config)
+        if snapshot.values and snapshot.next:
+            state = None
+
+    final_state = None
+    with profiled(should_profile(payload.get("profile", False))) as profiler:
+        async for mode, chunk in graph.astream(state, config, stream_mode=["updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+            else:
+                for node in chunk:
+                    if not node.startswith("__"):
+                        on_progress(node)
+    return investigation_result(final_state, job["id"], profiler)
+
+# Set by lifespan
+job_queue: Optional[JobQueue] = None
+
+@app.post("/osint/investigate")
+async def investigate(payload: InvestigationRequest):
+    session_id = str(uuid.uuid4())
+    state = {
+        "query": payload.query,
+        "retrieval_model": payload.retrieval_model,
+        "synthesis_model": payload.synthesis_model
+    }
+    profile = should_profile(payload.profile)
+
+    # Identical queries already in flight share one pipeline run (and its session);
+    # profiled runs are kept apart so their profile belongs to this request
+    try:
+        if COALESCE_ENABLED and not profile:
+            return await investigations.run(payload_key(payload), lambda: run_investigation(state, session_id))
+        return await run_investigation(state, session_id, profile)
+    except Exception as e:
+        print(f"❌ Investigation {session_id} failed: {e}")
+        return JSONResponse(status_code=500, content={"error": str(e), "session_id": session_id, "resumable": CHECKPOINTS_ENABLED})
+
+@app.post("/osint/investigate/{session_id}/resume")
+async def resume_investigation(session_id: str):
+    if graph.checkpointer is None:
+        return JSONResponse(status_code=503, content={"error": "Checkpointing is disabled"})
+
+    snapshot = await graph.aget_state(thread_config(session_id))
+    if not snapshot.values:
+        return JSONResponse(status_code=404, content={"error": "No checkpoint for this session"})
+    if not snapshot.next:
+        return JSONResponse(status_code=409, content={"error": "Investigation already completed"})
+
+    print(f"🔁 Resuming {session_id} at {', '.join(snapshot.next)}")
+    try:
+        return await investigations.run(f"resume:{session_id}", lambda: run_investigation(None, session_id))
+    except Exception as e:
+        print(f"❌ Resume of {session_id} failed: {e}")
+        return JSONResponse(status_code=500, content={"error": str(e), "session_id": session_id, "resumable": True})
+
+def format_node_update(node: str, update: dict, state: dict) -> list:
+    """Turn one LangGraph node update into the NDJSON events sent to the client."""
+    update = update or {}
+
+    if node == "QueryParser":
+        events = [{"step": "Query Analyzed 🔍", "parsed": update.get("parsed", {})}]
+        # Fused parse-and-plan mode plans in the same call
+        if update.get("tasks"):
+            events.append({"step": f"Planned {len(update['tasks'])} OSINT Tasks 🧠", "tasks": update["tasks"]})
+        return events
+    if node == "Planner":
+        tasks = update.get("tasks", [])
+        return [{"step": f"Planned {len(tasks)} OSINT Tasks 🧠", "tasks": tasks}]
+    if node == "Retriever":
+        failed = sum(1 for r in update.get("retrievals", {}).values() if r.get("failed"))
+        step = f"Retrieval Pass {update.get('retry_count', 1)} Complete 🌐"
+        if failed:
+            step += f" ({failed} searches failed)"
+        return [{"step": step, "task_errors": update.get("task_errors", {})}]
+    if node == "Deduplicator":
+        before = len(state.get("retrievals") or {})
+        after = len(update.get("deduplicated", {}))
+        return [{"step": f"Deduplicated Sources 📊 ({before} → {after})", "dedup": {"before": before, "after": after}}]
+    if node == "Synthesis":
+        return [{"step": "Report Synthesized 📝", "report": update.get("report", "")}]
+    if node == "GraphBuilder":
+        graph_data = update.get("graph", {})
+        return [{
+            "step": f"Entity Graph Built 🕸 ({len(graph_data.get('nodes', []))} nodes)",
+            "graph": graph_data,
+        }]
+    if node == "Judgement":
+        return [{"step": "Judgement Complete ⚖️", "judgement": update.get("judgement", {})}]
+    return []
+
+async def stream_investigation(state: dict, session_id: str, profile: bool = False):
+    yield json.dumps({"step": "Analyzing Query 🔍", "session_id": session_id}) + "\n"
+
+    final_state = dict(state)
+    with profiled(profile) as profiler:
+        try:
+            async for mode, chunk in graph.astream(state, thread_config(session_id), stream_mode=["updates", "custom", "values"]):
+                if mode == "values":
+                    final_state = chunk
+                elif mode == "custom" and "retrieval" in chunk:
+                    for task_id, result in chunk["retrieval"].items():
+                        yield json.dumps({
+                            "search": f"🔎 {task_id} complete: {result.get('query_used', '')}",
+                            "retrieval": {task_id: result},
+                        }) + "\n"
+                elif mode == "updates":
+                    for node, update in chunk.items():
+                        for event in format_node_update(node, update, final_state):
+                            yield json.dumps(event) + "\n"
+        except Exception as e:
+            print(f"❌ Investigation {session_id} failed: {e}")
+            yield json.dumps({"error": str(e), "session_id": session_id, "resumable": CHECKPOINTS_ENABLED}) + "\n"
+            return
+
+    state_path = save_osint_state_to_file(final_state, final_state["parsed"]["entity_name"])
+
+    citation_urls = deduplicate_citations(final_state["retrievals"])
+
+    final = {
+        "report": final_state["report"],
+        "credibility_score": final_state["judgement"]["credibility_score"],
+        "flagged_issues": final_state["judgement"]["flagged_issues"],
+        "parsed": final_state["parsed"],
+        "citations": citation_urls,
+        "risk_assessment": final_state["judgement"].get("risk_assessment", {
+            "risk_score": "N/A",
+            "verdict": "UNKNOWN",
+            "risk_signals": ["Risk assessment missing."]
+        })
+    }
+    if profiler is not None:
+        final["profile"] = profiler.save(profile_path(state_path)).name
+    yield json.dumps({"final": final}) + "\n"
 
 @app.post("/osint/investigate-stream")
-def investigate_stream(payload: InvestigationRequest):
+async def investigate_stream(payload: InvestigationRequest):
     session_id = str(uuid.uuid4())
     state = {
         "query": payload.query,
         "retrieval_model": payload.retrieval_model,
         "synthesis_model": payload.synthesis_model,
     }
+    profile = should_profile(payload.profile)
+
+    async def generate():
+        # A duplicate of a stream already running attaches to it, replaying what it missed
+        if COALESCE_ENABLED and not profile:
+            events = investigation_streams.subscribe(payload_key(payload), lambda: stream_investigation(state, session_id))
+        else:
+            events = stream_investigation(state, session_id, profile)
+        async for event in events:
+            yield event
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+@app.post("/osint/investigate-batch")
+async def investigate_batch_stream(payload: BatchInvestigationRequest):
+    session_ids = [str(uuid.uuid4()) for _ in payload.queries]
 
-    def generate():
-        yield json.dumps({"step": "Analyzing Query 🔍"}) + "\n"
-        time.sleep(0.5)
-        yield json.dumps({"parsed": state["query"]}) + "\n"
-        yield json.dumps({"step": "Planning OSINT Tasks 🧠"}) + "\n"
-        time.sleep(0.5)
-        yield json.dumps({"step": "Running Web Searches 🌐"}) + "\n"
-        for i in range(1, 9):
-            yield json.dumps({"search": f"🔎 Running web search for task {i}..."}) + "\n"
-            time.sleep(0.3)
-        yield json.dumps({"step": "Scoring & Evaluating Sources 📊"}) + "\n"
-        time.sleep(1)
-        yield json.dumps({"step": "Synthesizing Final Report 📝"}) + "\n"
-
-        final_state = graph.invoke(state)
-        save_osint_state_to_file(final_state, final_state["parsed"]["entity_name"])
-
-        citation_urls = deduplicate_citations(final_state["retrievals"])
-
-        yield json.dumps({
-            "final": {
-                "report": final_state["report"],
-                "credibility_score": final_state["judgement"]["credibility_score"],
-                "flagged_issues": final_state["judgement"]["flagged_issues"],
-                "parsed": final_state["parsed"],
-                "citations": citation_urls,
-                "risk_assessment": final_state["judgement"].get("risk_assessment", {
-                    "risk_score": "N/A",
-                    "verdict": "UNKNOWN",
-                    "risk_signals": ["Risk assessment missing."]
-                })
-            }
-        }) + "\n"
+    async def generate():
+        events = investigate_batch(
+            payload.queries,
+            graph,
+            retrieval_model=payload.retrieval_model,
+            synthesis_model=payload.synthesis_model,
+            config_for=lambda i: thread_config(session_ids[i]),
+        )
+        try:
+            async for event in events:
+                if "final_state" in event:
+                    event = {"index": event["index"], "query": event["query"], "result": investigation_result(event.pop("final_state"), session_ids[event["index"]])}
+                elif "index" in event:
+                    event["session_id"] = session_ids[event["index"]]
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            print(f"❌ Batch failed: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            await events.aclose()
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
+@app.post("/osint/jobs")
+async def submit_job(payload: JobRequest):
+    try:
+        job = await job_queue.submit(payload.dict(exclude={"priority"}), priority=payload.priority)
+    except QueueFullError as e:
+        return JSONResponse(status_code=429, content={"error": str(e)}, headers={"Retry-After": "30"})
+    return JSONResponse(status_code=202, content={"job_id": job["id"], "status": job["status"]})
+
+@app.get("/osint/jobs/stats")
+def job_queue_stats():
+    return job_queue.stats()
+
+@app.get("/osint/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return job_summary(job)
+
+@app.get("/osint/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    if await job_queue.aget(job_id) is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+
+    async def generate():
+        async for job in job_queue.watch(job_id):
+            yield json.dumps(job_summary(job)) + "\n"
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+@app.delete("/osint/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    try:
+        job = await job_queue.cancel(job_id)
+    except JobNotOwnedError as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return job_summary(job)
+
+@app.get("/health/live")
+def liveness():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def readiness():
+    models = models_ready()
+    ready = all(models.values())
+    content = {"ready": ready, "models": models, "timings": warmup_timings}
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/osint/cache/stats")
+def search_cache_stats():
+    return get_search_cache().stats()
+
+@app.get("/osint/coalesce/stats")
+def coalescing_stats():
+    return coalesce_stats()
+
+@app.get("/osint/scheduler/metrics")
+def provider_scheduler_metrics():
+    return scheduler_metrics()
+
 @app.get("/chat/{session_id}")
 def get_history(session_id: str):
     return get_chat_history(session_id)
@@ -155,3 +420,11 @@ def load_osint_state(filename: str):
         return JSONResponse(status_code=404, content={"error": "File not found"})
     osint_state = load_osint_state_from_file(str(file_path))
     return osint_state.dict()
+
+@app.get("/osint/history/profile/{filename}")
+def get_profile_file(filename: str):
+    # Accepts the investigation's state filename or the profile's own
+    file_path = profile_path(AUDIT_LOG_DIR / filename)
+    if not file_path.exists():
+        return JSONResponse(status_code=404, content={"error": "Profile not found"})
+    return FileResponse(file_path, media_type="text/plain", filename=file_path.name)
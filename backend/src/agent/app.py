@@ -59,23 +59,56 @@ def create_frontend_router(build_dir="../frontend/dist"):
 
 # src/app.py
 
+import argparse
+import asyncio
+
 from langgraph_app import build_graph
 from audit_log import save_osint_state_to_file
 from chat_logger import init_db, log_session, log_message, get_chat_history
+from batch import investigate_batch
+
+
+async def run_batch_cli(path: str, retrieval_model: str, synthesis_model: str):
+    with open(path, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    graph = build_graph()
+    async for event in investigate_batch(queries, graph, retrieval_model, synthesis_model):
+        if "final_state" in event:
+            final_state = event["final_state"]
+            save_osint_state_to_file(final_state, final_state["parsed"]["entity_name"])
+            print(f"\n✅ [{event['index'] + 1}/{len(queries)}] {final_state['parsed']['entity_name']}: "
+                  f"credibility {final_state['judgement'].get('credibility_score', 'N/A')}")
+        elif "error" in event:
+            print(f"\n❌ [{event['index'] + 1}/{len(queries)}] {event['query']}: {event['error']}")
+        else:
+            print(f"\n{event['step']}")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run OSINT investigations from the command line")
+    parser.add_argument("--query", default="Investigate Ali Khaledi Nasab an Irani AI Researcher working for Amazon")
+    parser.add_argument("--batch", metavar="FILE", help="investigate every non-empty line of FILE as one batch")
+    parser.add_argument("--retrieval-model", default="gpt-4o-mini-search-preview")
+    parser.add_argument("--synthesis-model", default="gemini-2.0-flash")
+    args = parser.parse_args()
+
+    if args.batch:
+        asyncio.run(run_batch_cli(args.batch, args.retrieval_model, args.synthesis_model))
+        raise SystemExit(0)
+
     init_db()
 
     # Replace with real session from frontend later
     session_id = "session_cli_001"
-    input_query = "Investigate Ali Khaledi Nasab an Irani AI Researcher working for Amazon"
+    input_query = args.query
 
     graph = build_graph()
-    final_state = graph.invoke({
+    final_state = asyncio.run(graph.ainvoke({
     "query": input_query,
-    "retrieval_model": "gpt-4o-mini-search-preview",  # or "gpt-4o"
-    "synthesis_model": "gemini-2.0-flash"              # or "gemini-2.0-flash"
-})
+    "retrieval_model": args.retrieval_model,  # or "gpt-4o"
+    "synthesis_model": args.synthesis_model   # or "gemini-2.0-flash"
+}))
 
     log_session(session_id, entity=final_state["parsed"]["entity_name"])
     log_message(session_id, "user", input_query)
@@ -3,7 +3,7 @@ from datetime import datetime
 from pathlib import Path
 from agent.state import OSINTState
 
-def save_osint_state_to_file(state: dict, entity_name: str):
+def save_osint_state_to_file(state: dict, entity_name: str) -> Path:
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     filename = f"{entity_name.replace(' ', '_')}_{timestamp}.json"
     output_dir = Path("output_logs")
@@ -13,6 +13,7 @@ def save_osint_state_to_file(state: dict, entity_name: str):
         json.dump(state, f, indent=2, ensure_ascii=False)
 
     print(f"📦 OSINT state saved to: {output_dir / filename}")
+    return output_dir / filename
 
 def load_osint_state_from_file(file_path: str) -> OSINTState:
     with open(file_path, "r", encoding="utf-8") as f:
@@ -0,0 +1,149 @@
+# src/agent/batch.py
+
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from agent.agents.planner_agent import batch_planner_agent
+from agent.agents.query_parser_agent import batch_query_parser_agent
+from agent.agents.retriever_pivot_agent import run_web_search
+from agent.search_cache import make_cache_key, normalize_text
+
+logger = logging.getLogger(__name__)
+
+BATCH_PARSE_SIZE = int(os.getenv("OSINT_BATCH_PARSE_SIZE", "10"))
+BATCH_PLAN_SIZE = int(os.getenv("OSINT_BATCH_PLAN_SIZE", "5"))
+# Entities whose dedup/synthesis/graph/judgement stages may run at once
+BATCH_CONCURRENCY = int(os.getenv("OSINT_BATCH_CONCURRENCY", "8"))
+
+
+def chunked(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def entity_key(parsed: Dict) -> tuple:
+    return tuple(
+        normalize_text(str(parsed.get(field, "")))
+        for field in ("entity_type", "entity_name", "affiliation", "location", "keywords")
+    )
+
+
+async def parse_queries(queries: List[str]) -> List[Dict]:
+    batches = await asyncio.gather(*[batch_query_parser_agent(chunk) for chunk in chunked(queries, BATCH_PARSE_SIZE)])
+    return [parsed for batch in batches for parsed in batch]
+
+
+async def plan_entities(parsed: List[Dict]) -> List[List[str]]:
+    # The same entity asked about twice is planned once
+    unique: Dict[tuple, Dict] = {}
+    for p in parsed:
+        unique.setdefault(entity_key(p), p)
+    keys = list(unique)
+    batches = await asyncio.gather(*[
+        batch_planner_agent([unique[k] for k in chunk]) for chunk in chunked(keys, BATCH_PLAN_SIZE)
+    ])
+    plans = dict(zip(keys, [plan for batch in batches for plan in batch]))
+    return [plans[entity_key(p)] for p in parsed]
+
+
+class SharedSearches:
+    """Starts each distinct (task, entity, model) search once and hands the result to every entity that planned it."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._searches: Dict[str, asyncio.Task] = {}
+        self.requested = 0
+
+    def search(self, task: str, entity_name: str) -> asyncio.Task:
+        self.requested += 1
+        key = make_cache_key(task, entity_name, self.model_name)
+        if key not in self._searches:
+            self._searches[key] = asyncio.create_task(self._run(task, entity_name))
+        return self._searches[key]
+
+    async def _run(self, task: str, entity_name: str) -> Dict:
+        result = await run_web_search(task, entity_name, 0, self.model_name)
+        return result["task_0"]
+
+    def stats(self) -> Dict:
+        return {"requested": self.requested, "unique": len(self._searches)}
+
+    async def cancel(self):
+        """Cancel the searches still running and wait for them to stop."""
+        running = [t for t in self._searches.values() if not t.done()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def investigate_batch(
+    queries: List[str],
+    graph,
+    retrieval_model: str = "gpt-4o-mini-search-preview",
+    synthesis_model: str = "gemini-2.0-flash",
+    config_for: Optional[Callable[[int], Dict]] = None,
+) -> AsyncIterator[Dict]:
+    """Investigates many queries at once, yielding one event per entity as each finishes.
+
+    Parsing and planning go out in batched LLM calls, identical searches across
+    entities run once, and each entity then enters ``graph`` with its parsed query,
+    tasks and first-pass retrievals already filled in, so only the retry pass and
+    the downstream stages run per entity. ``config_for(index)`` supplies the
+    LangGraph config for each entity's run.
+    """
+    parsed = await parse_queries(queries)
+    plans = await plan_entities(parsed)
+    yield {"step": f"Parsed and planned {len(queries)} queries 🧠", "parsed": parsed, "tasks": plans}
+
+    searches = SharedSearches(retrieval_model)
+    runs: List[asyncio.Task] = []
+    try:
+        pending = [
+            [searches.search(task, p.get("entity_name", "")) for task in tasks]
+            for p, tasks in zip(parsed, plans)
+        ]
+        logger.info("🔎 Batch of %d: %d unique searches for %d tasks", len(queries), searches.stats()["unique"], searches.requested)
+        limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def investigate_one(i: int) -> Dict:
+            results = await asyncio.gather(*pending[i])
+            state = {
+                "query": queries[i],
+                "parsed": parsed[i],
+                "tasks": plans[i],
+                # Copies, since entities sharing a search must not share the dict
+                "retrievals": {f"task_{n}": dict(r) for n, r in enumerate(results, 1)},
+                "retry_count": 1,
+                "retrieval_model": retrieval_model,
+                "synthesis_model": synthesis_model,
+            }
+            async with limit:
+                final_state = await graph.ainvoke(state, config_for(i) if config_for else None)
+            return final_state
+
+        async def run(i: int):
+            try:
+                return i, await investigate_one(i), None
+            except Exception as e:
+                logger.error("❌ Batch item %d failed: %s", i, e)
+                return i, None, e
+
+        runs = [asyncio.create_task(run(i)) for i in range(len(queries))]
+        for finished in asyncio.as_completed(runs):
+            i, final_state, error = await finished
+            event = {"index": i, "query": queries[i]}
+            if error is not None:
+                event["error"] = str(error)
+            else:
+                event["final_state"] = final_state
+            yield event
+
+        yield {"step": "Batch complete ✅", "searches": searches.stats()}
+    finally:
+        # The consumer may stop early (e.g. the client disconnected): don't leave
+        # entity runs or shared searches running in the background
+        for task in runs:
+            task.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+        await searches.cancel()
@@ -0,0 +1,27 @@
+# src/agent/checkpoints.py
+
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB = os.getenv("OSINT_CHECKPOINT_DB", "checkpoints.db")
+CHECKPOINTS_ENABLED = os.getenv("OSINT_CHECKPOINTS_ENABLED", "1") == "1"
+
+
+def thread_config(session_id: str) -> Dict:
+    """LangGraph config that files an investigation's checkpoints under its session ID."""
+    return {"configurable": {"thread_id": session_id}}
+
+
+@asynccontextmanager
+async def open_checkpointer(db_file: str = CHECKPOINT_DB) -> AsyncIterator[AsyncSqliteSaver]:
+    """Open the SQLite checkpoint store; it must live for as long as the graph using it."""
+    async with AsyncSqliteSaver.from_conn_string(db_file) as saver:
+        await saver.setup()
+        logger.info("💾 Checkpointing investigations to %s", db_file)
+        yield saver
@@ -0,0 +1,127 @@
+# src/agent/coalesce.py
+
+import asyncio
+import hashlib
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from agent.search_cache import normalize_text
+
+COALESCE_ENABLED = os.getenv("OSINT_COALESCE_ENABLED", "1") == "1"
+
+
+def investigation_key(query: str, retrieval_model: Optional[str], synthesis_model: Optional[str]) -> str:
+    raw = "|".join([normalize_text(query), retrieval_model or "", synthesis_model or ""])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one copy of a keyed coroutine at a time; concurrent callers share its result.
+
+    The work runs as its own task, so a caller that disconnects does not cancel
+    it for the others still waiting.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(make_call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class StreamBroadcast:
+    """Buffers the events of one running stream so any number of subscribers can follow it.
+
+    Subscribers that attach late replay the buffered events before following live ones.
+    """
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self._changed = asyncio.Condition()
+
+    async def pump(self, source: AsyncIterator[Any]):
+        try:
+            async for event in source:
+                async with self._changed:
+                    self.events.append(event)
+                    self._changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: index < len(self.events) or self.done)
+                batch = self.events[index:]
+                finished = self.done
+            index += len(batch)
+            for event in batch:
+                yield event
+            if finished and index >= len(self.events):
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class StreamSingleFlight:
+    """Single-flight for streaming responses: duplicates attach to the stream already running."""
+
+    def __init__(self):
+        self._inflight: Dict[str, StreamBroadcast] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def subscribe(self, key: str, make_stream: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        broadcast = self._inflight.get(key)
+        if broadcast is None:
+            self.leaders += 1
+            broadcast = StreamBroadcast()
+            self._inflight[key] = broadcast
+
+            async def produce():
+                try:
+                    await broadcast.pump(make_stream())
+                finally:
+                    self._inflight.pop(key, None)
+                    self._tasks.pop(key, None)
+
+            self._tasks[key] = asyncio.create_task(produce())
+        else:
+            self.coalesced += 1
+        return broadcast.subscribe()
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+investigations = SingleFlight()
+investigation_streams = StreamSingleFlight()
+
+
+def coalesce_stats() -> Dict:
+    return {
+        "enabled": COALESCE_ENABLED,
+        "investigate": investigations.stats(),
+        "investigate_stream": investigation_streams.stats(),
+    }
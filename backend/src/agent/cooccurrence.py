@@ -0,0 +1,87 @@
+# src/agent/cooccurrence.py
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Documents per block when locating the first document shared by a pair.
+# Block weights are powers of two, which float64 sums exactly up to 2**53.
+FIRST_DOC_BLOCK = 52
+
+
+def incidence_matrix(entities_per_doc: List[List[str]]) -> Tuple[sparse.csr_matrix, List[str]]:
+    """Build the binary document × entity matrix, with entity IDs in first-seen order."""
+    ids: Dict[str, int] = {}
+    rows, cols = [], []
+    for doc, entities in enumerate(entities_per_doc):
+        for entity in dict.fromkeys(entities):
+            rows.append(doc)
+            cols.append(ids.setdefault(entity, len(ids)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(len(entities_per_doc), len(ids)),
+    )
+    return matrix, list(ids)
+
+
+def first_shared_doc(incidence: sparse.csr_matrix, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Return, for each entity pair (rows[k], cols[k]), the first document containing both.
+
+    Pairs must be sorted by (row, col), as in a canonical upper-triangular matrix.
+    Within a block of documents, document j gets weight 2**(block - 1 - j), so the
+    highest set bit of the pair's weighted co-occurrence identifies the earliest
+    shared document in that block.
+    """
+    n_docs, n_entities = incidence.shape
+    pair_keys = rows.astype(np.int64) * n_entities + cols
+    firsts = np.zeros(len(pair_keys), dtype=np.int64)
+
+    # Walk blocks last to first so the earliest block containing a pair writes last
+    for start in reversed(range(0, n_docs, FIRST_DOC_BLOCK)):
+        block = incidence[start:start + FIRST_DOC_BLOCK]
+        size = block.shape[0]
+        bits = sparse.diags(2.0 ** np.arange(size - 1, -1, -1))
+        weighted = sparse.triu(block.T @ bits @ block, k=1).tocoo()
+        if weighted.nnz == 0:
+            continue
+        _, exponent = np.frexp(weighted.data)
+        positions = np.searchsorted(pair_keys, weighted.row.astype(np.int64) * n_entities + weighted.col)
+        firsts[positions] = start + size - exponent
+    return firsts
+
+
+def build_cooccurrence_graph(tasks: List[str], entities_per_task: List[List[str]], scores: List[float]) -> Dict:
+    """Build the weighted entity co-occurrence graph in the frontend {"nodes", "edges"} format.
+
+    An edge's weight is the summed score of every task mentioning both entities,
+    and its ``task`` is the first such task.
+    """
+    incidence, names = incidence_matrix(entities_per_task)
+    nodes = [{"id": name, "label": "entity"} for name in names]
+    if incidence.nnz == 0:
+        return {"nodes": nodes, "edges": []}
+
+    # Edges come from the co-occurrence counts, so pairs whose scores sum to zero
+    # still get an edge; weights are read from the score-weighted product
+    counts = sparse.triu(incidence.T @ incidence, k=1).tocsr()
+    counts.sort_indices()
+    counts = counts.tocoo()
+    weighted = (incidence.T @ sparse.diags(np.asarray(scores, dtype=np.float64)) @ incidence).tocsr()
+    edge_weights = np.asarray(weighted[counts.row, counts.col]).ravel()
+
+    first_docs = first_shared_doc(incidence, counts.row, counts.col)
+
+    names = np.array(names, dtype=object)
+    edges = [
+        {"source": source, "target": target, "weight": weight, "task": task}
+        for source, target, weight, task in zip(
+            names[counts.row].tolist(),
+            names[counts.col].tolist(),
+            edge_weights.tolist(),
+            np.array(tasks, dtype=object)[first_docs].tolist(),
+        )
+    ]
+    return {"nodes": nodes, "edges": edges}
+
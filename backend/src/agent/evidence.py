@@ -0,0 +1,152 @@
+# src/agent/evidence.py
+#
+# Packs retrievals into a compact, token-budgeted evidence block for the
+# judgement prompt. Only what the judge needs is kept (task, date, score, text,
+# source domains); each item gets a short ID ("E1") and the full provenance
+# (task id, hash, URLs) stays in an index returned alongside, so citations in
+# the judge's answer can be traced back.
+
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+EVIDENCE_TOKEN_BUDGET = int(os.getenv("OSINT_EVIDENCE_TOKEN_BUDGET", "3000"))
+# Cap per item, so one long retrieval can't crowd out the rest
+EVIDENCE_ITEM_MAX_TOKENS = int(os.getenv("OSINT_EVIDENCE_ITEM_MAX_TOKENS", "400"))
+# 0 ranks purely by decayed_score; higher favours items unlike those already packed
+EVIDENCE_NOVELTY_WEIGHT = float(os.getenv("OSINT_EVIDENCE_NOVELTY_WEIGHT", "0.3"))
+
+_WORD = re.compile(r"\w+")
+TRUNCATION_MARK = " …"
+_encoding = None
+
+
+# --- Token counting ---
+
+def get_encoding():
+    # cl100k_base approximates the Claude tokenizer closely enough for budgeting;
+    # without it (e.g. offline, where tiktoken can't fetch its vocabulary) fall
+    # back to ~4 characters per token
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning("⚠️ tiktoken unavailable, estimating tokens from length: %s", e)
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cuts ``text`` to at most ``max_tokens`` tokens, including the truncation mark."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    # The mark counts against the limit
+    keep = max(0, max_tokens - count_tokens(TRUNCATION_MARK))
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:keep * 4].rsplit(" ", 1)[0] + TRUNCATION_MARK
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:keep]) + TRUNCATION_MARK
+
+
+# --- Packing ---
+
+def source_domains(citations: List[Dict]) -> List[str]:
+    domains = []
+    for c in citations or []:
+        domain = urlparse(c.get("url", "")).netloc.removeprefix("www.")
+        if domain and domain not in domains:
+            domains.append(domain)
+    return domains
+
+
+def novelty(words: set, packed: List[set]) -> float:
+    """1 minus the highest word-set Jaccard overlap with anything already packed."""
+    if not words or not packed:
+        return 1.0
+    return 1.0 - max(len(words & other) / len(words | other) for other in packed)
+
+
+def format_item(evidence_id: str, task_id: str, item: Dict, text: str) -> str:
+    published = str(item.get("published") or "")[:10] or "n/a"
+    header = f"[{evidence_id}] {task_id} | score {float(item.get('decayed_score') or 0):.2f} | published {published}"
+    query = item.get("query_used")
+    domains = source_domains(item.get("citations", []))
+    lines = [header]
+    if query:
+        lines.append(f"Task: {query}")
+    lines.append(text)
+    if domains:
+        lines.append(f"Sources: {', '.join(domains)}")
+    return "\n".join(lines)
+
+
+def pack_evidence(retrievals: Dict[str, Dict], budget: Optional[int] = None) -> Tuple[str, Dict[str, Dict]]:
+    """Fill ``budget`` tokens greedily with the best remaining retrievals.
+
+    Each pick is ranked by ``decayed_score`` blended with novelty against what is
+    already packed. Returns the evidence block and an index of ``{"E1": {"task", "hash", "urls"}}``.
+    """
+    budget = EVIDENCE_TOKEN_BUDGET if budget is None else budget
+    candidates = []
+    for task_id, item in retrievals.items():
+        # Failed searches carry only an error message; nothing for the judge to verify
+        if item.get("failed") or not item.get("data"):
+            continue
+        text = truncate_tokens(" ".join(item["data"].split()), EVIDENCE_ITEM_MAX_TOKENS)
+        candidates.append((task_id, item, text, set(_WORD.findall(text.lower()))))
+
+    blocks, index, packed_words = [], {}, []
+    used = 0
+    while candidates and used < budget:
+        best = max(
+            range(len(candidates)),
+            key=lambda i: (1 - EVIDENCE_NOVELTY_WEIGHT) * float(candidates[i][1].get("decayed_score") or 0)
+            + EVIDENCE_NOVELTY_WEIGHT * novelty(candidates[i][3], packed_words),
+        )
+        task_id, item, text, words = candidates.pop(best)
+        evidence_id = f"E{len(index) + 1}"
+        block = format_item(evidence_id, task_id, item, text)
+        tokens = count_tokens(block) + 1
+        if used + tokens > budget:
+            # Whatever fits of the best remaining item, if that is still worth sending;
+            # otherwise a later, shorter item may still fit
+            room = budget - used - (tokens - count_tokens(text))
+            if room < 50:
+                continue
+            block = format_item(evidence_id, task_id, item, truncate_tokens(text, room))
+            tokens = count_tokens(block) + 1
+            if used + tokens > budget:
+                continue
+        blocks.append(block)
+        used += tokens
+        packed_words.append(words)
+        index[evidence_id] = {
+            "task": task_id,
+            "hash": item.get("hash"),
+            "urls": [c["url"] for c in item.get("citations", []) if c.get("url")],
+        }
+
+    skipped = len(retrievals) - len(index)
+    logger.info("📦 Packed %d evidence items into ~%d tokens (%d left out)", len(index), used, skipped)
+    return "\n\n".join(blocks) or "No usable retrieval evidence.", index
+
+
+def link_evidence_ids(text: str, index: Dict[str, Dict]) -> str:
+    """Turn ``[E3]`` markers into links to the item's first URL."""
+    def link(match):
+        urls = index.get(match.group(1), {}).get("urls")
+        return f"[{match.group(1)}]({urls[0]})" if urls else match.group(0)
+    return re.sub(r"\[(E\d+)\](?!\()", link, text)
@@ -0,0 +1,75 @@
+# src/agent/incremental.py
+#
+# Overlaps the per-retrieval CPU work with searches still in flight. Each
+# retrieval is embedded (for dedup) and run through NER (for the graph) as soon
+# as its search returns, and the results land in the embedding and entity
+# caches. By the time the last search is back, Deduplicator and GraphBuilder
+# only have their cheap, order-dependent final steps left (the greedy keep mask
+# and graph assembly), which still run in task order so results are the same as
+# a non-incremental run.
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from agent.agents.deduplication_agent import embed_retrievals
+from agent.agents.graph_builder_agent import extract_retrieval_entities
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_ENABLED = os.getenv("OSINT_INCREMENTAL_PROCESSING", "1") == "1"
+
+
+def precompute(retrievals: List[Dict]):
+    embed_retrievals(retrievals)
+    extract_retrieval_entities(retrievals)
+
+
+class RetrievalPrecompute:
+    """Processes retrievals in the background as they are submitted.
+
+    One worker runs at a time, off the event loop; whatever arrives while it is
+    busy is processed as the next batch.
+    """
+
+    def __init__(self):
+        self._pending: List[Dict] = []
+        self._worker: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    def submit(self, retrieval: Dict):
+        # Failed searches carry only an error message and are never deduplicated or graphed
+        if retrieval.get("failed") or not retrieval.get("data"):
+            return
+        self._pending.append(retrieval)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(precompute, batch)
+                self.processed += len(batch)
+            except Exception as e:
+                # The Deduplicator and GraphBuilder nodes compute whatever is missing
+                logger.warning("⚠️ Incremental processing failed for %d retrievals: %s", len(batch), e)
+            self.busy_seconds += time.perf_counter() - start
+
+    async def drain(self):
+        """Wait until everything submitted so far has been processed."""
+        while self._worker is not None and not self._worker.done():
+            await self._worker
+
+    def cancel(self):
+        """Drop pending retrievals and stop the worker.
+
+        A batch already in its thread runs to completion, but only fills the caches.
+        """
+        self._pending.clear()
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
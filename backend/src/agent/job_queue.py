@@ -0,0 +1,376 @@
+# src/agent/job_queue.py
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_DB = os.getenv("OSINT_JOB_DB", "jobs.db")
+JOB_WORKERS = int(os.getenv("OSINT_JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("OSINT_JOB_QUEUE_MAX", "100"))
+# Each process refreshes its claims this often; claims older than JOB_CLAIM_TTL are taken over
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("OSINT_JOB_HEARTBEAT_INTERVAL", "10"))
+JOB_CLAIM_TTL = float(os.getenv("OSINT_JOB_CLAIM_TTL", "60"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# A runner gets the job and a progress callback, and returns the JSON-serializable result
+JobRunner = Callable[[Dict, Callable[[str], None]], Awaitable[Dict]]
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobNotOwnedError(Exception):
+    """The job is queued or running in another worker process."""
+
+
+class JobQueue:
+    """Priority job queue run by a fixed pool of async workers, persisted to SQLite.
+
+    Higher ``priority`` runs first, FIFO within a priority. Submissions are refused
+    once ``max_queued`` jobs are waiting.
+
+    Several processes (e.g. ``uvicorn --workers N``) can share one database: each job
+    is claimed by exactly one process, which keeps a heartbeat on its claims. Jobs
+    left queued or running by a process that stopped or died are taken over once
+    their claim is released or goes stale.
+    """
+
+    def __init__(self, runner: JobRunner, workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_MAX, db_file: str = JOB_DB):
+        self.runner = runner
+        self.n_workers = workers
+        self.max_queued = max_queued
+        self.db_file = db_file
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, Dict] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._notifications = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()
+        self._changed: Optional[asyncio.Condition] = None
+        # SQLite writes run off the event loop on one thread, so they land in the order they were issued
+        self._db: Optional[ThreadPoolExecutor] = None
+        self._version = 0
+        self.rejected = 0
+        self.finished = {status: 0 for status in TERMINAL_STATUSES}
+        self._init_db()
+
+    # --- Persistence ---
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_file, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT,
+            priority INTEGER,
+            payload TEXT,
+            progress TEXT,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER,
+            created_at REAL,
+            started_at REAL,
+            finished_at REAL,
+            owner TEXT,
+            heartbeat REAL
+        )""")
+        # Databases created before claims were added
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        conn.commit()
+        conn.close()
+
+    def _save(self, job: Dict):
+        conn = self._connect()
+        conn.execute("""
+        INSERT OR REPLACE INTO jobs (id, status, priority, payload, progress, result, error, attempts, created_at, started_at, finished_at, owner, heartbeat)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            job["id"], job["status"], job["priority"], json.dumps(job["payload"]), job["progress"],
+            json.dumps(job["result"]) if job["result"] is not None else None, job["error"],
+            job["attempts"], job["created_at"], job["started_at"], job["finished_at"],
+            self.owner, time.time(),
+        ))
+        conn.commit()
+        conn.close()
+
+    def _load(self, job_id: str) -> Optional[Dict]:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        job = {k: v for k, v in dict(row).items() if k not in ("owner", "heartbeat")}
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    async def _in_db_thread(self, fn: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._db, fn, *args)
+
+    # --- Claims ---
+
+    def _claim_unowned(self) -> List[Dict]:
+        """Atomically claims unfinished jobs whose owner released them or stopped heartbeating."""
+        conn = self._connect()
+        stale = time.time() - JOB_CLAIM_TTL
+        ids = [r[0] for r in conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) AND (owner IS NULL OR heartbeat < ?) "
+            "ORDER BY priority DESC, created_at ASC", (QUEUED, RUNNING, stale)
+        )]
+        claimed = []
+        for job_id in ids:
+            # Only one process's UPDATE can match a given job; the rest see rowcount 0
+            cursor = conn.execute(
+                "UPDATE jobs SET owner = ?, heartbeat = ? WHERE id = ? AND status IN (?, ?) "
+                "AND (owner IS NULL OR heartbeat < ?)",
+                (self.owner, time.time(), job_id, QUEUED, RUNNING, stale),
+            )
+            conn.commit()
+            if cursor.rowcount == 1:
+                claimed.append(job_id)
+        conn.close()
+        return [self._load(job_id) for job_id in claimed]
+
+    def _claim_to_run(self, job_id: str) -> bool:
+        """Mark the job running under this process unless another process holds a live claim on it."""
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, owner = ?, heartbeat = ? WHERE id = ? AND status IN (?, ?) "
+            "AND (owner IS NULL OR owner = ? OR heartbeat < ?)",
+            (RUNNING, self.owner, now, job_id, QUEUED, RUNNING, self.owner, now - JOB_CLAIM_TTL),
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount == 1
+
+    def _refresh_claims(self):
+        conn = self._connect()
+        conn.execute(
+            "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN (?, ?)",
+            (time.time(), self.owner, QUEUED, RUNNING),
+        )
+        conn.commit()
+        conn.close()
+
+    def _release_claims(self):
+        conn = self._connect()
+        conn.execute("UPDATE jobs SET owner = NULL WHERE owner = ? AND status IN (?, ?)", (self.owner, QUEUED, RUNNING))
+        conn.commit()
+        conn.close()
+
+    async def _enqueue_recovered(self):
+        claimed = await self._in_db_thread(self._claim_unowned)
+        recovered = [job for job in claimed if job["id"] not in self.jobs]
+        for job in recovered:
+            self.jobs[job["id"]] = job
+            self._queue.put_nowait((-job["priority"], next(self._order), job["id"]))
+        if recovered:
+            logger.info("📋 Re-queued %d unfinished jobs", len(recovered))
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+            try:
+                await self._in_db_thread(self._refresh_claims)
+                await self._enqueue_recovered()
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Job heartbeat failed: %s", e)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._changed = asyncio.Condition()
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-db")
+        await self._enqueue_recovered()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.n_workers)]
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        tasks = self._workers + [self._heartbeat] if self._heartbeat else self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers, self._heartbeat = [], None
+        await asyncio.gather(*self._notifications, return_exceptions=True)
+        # Unfinished jobs keep their status; releasing the claims lets another process take them over.
+        # It runs after every save already issued, so none of them can re-claim a job afterwards.
+        await self._in_db_thread(self._release_claims)
+        self._db.shutdown()
+        self._db = None
+
+    def _notify_soon(self, job: Dict):
+        # Hold a reference so the notification can't be garbage-collected mid-run
+        task = asyncio.create_task(self._notify(job))
+        self._notifications.add(task)
+        task.add_done_callback(self._notifications.discard)
+
+    async def _notify(self, job: Dict):
+        await self._in_db_thread(self._save, job)
+        # Finished jobs are served from SQLite; only live ones stay in memory
+        if job["status"] in TERMINAL_STATUSES and self.jobs.pop(job["id"], None) is not None:
+            self.finished[job["status"]] += 1
+        async with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    async def _worker(self, worker_id: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] not in (QUEUED, RUNNING):
+                self._queue.task_done()
+                continue
+            if not await self._in_db_thread(self._claim_to_run, job_id):
+                # Another process took the job over (e.g. after this one stalled past JOB_CLAIM_TTL)
+                self.jobs.pop(job_id, None)
+                self._queue.task_done()
+                continue
+
+            job["status"] = RUNNING
+            job["attempts"] += 1
+            job["started_at"] = time.time()
+            await self._notify(job)
+
+            def on_progress(step: str, job=job):
+                job["progress"] = step
+                self._notify_soon(job)
+
+            task = asyncio.create_task(self.runner(job, on_progress))
+            self._running[job_id] = task
+            try:
+                job["result"] = await task
+                job["status"] = SUCCEEDED
+            except asyncio.CancelledError:
+                if job_id not in self._cancel_requested:
+                    # The worker itself is shutting down; leave the job to be recovered
+                    raise
+                job["status"] = CANCELLED
+            except Exception as e:
+                logger.error("❌ Job %s failed: %s", job_id, e)
+                job["status"] = FAILED
+                job["error"] = str(e)
+            finally:
+                self._running.pop(job_id, None)
+                self._cancel_requested.discard(job_id)
+                self._queue.task_done()
+            job["finished_at"] = time.time()
+            await self._notify(job)
+
+    # --- Public API ---
+
+    def queued_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job["status"] == QUEUED)
+
+    async def submit(self, payload: Dict[str, Any], priority: int = 0) -> Dict:
+        if self.queued_count() >= self.max_queued:
+            self.rejected += 1
+            raise QueueFullError(f"Job queue is full ({self.max_queued} waiting)")
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "status": QUEUED,
+            "priority": priority,
+            "payload": payload,
+            "progress": None,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self.jobs[job["id"]] = job
+        await self._notify(job)
+        self._queue.put_nowait((-priority, next(self._order), job["id"]))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.jobs.get(job_id) or self._load(job_id)
+
+    async def aget(self, job_id: str) -> Optional[Dict]:
+        """Look up a job like ``get``, reading SQLite off the event loop."""
+        return self.jobs.get(job_id) or await asyncio.to_thread(self._load, job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancel a job this process owns; finished jobs are returned unchanged.
+
+        Raises JobNotOwnedError for unfinished jobs owned by another worker process.
+        """
+        job = await self.aget(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+        if job_id not in self.jobs:
+            raise JobNotOwnedError(f"Job {job_id} is {job['status']} in another worker process")
+        if job_id in self._running:
+            self._cancel_requested.add(job_id)
+            self._running[job_id].cancel()
+        else:
+            job["status"] = CANCELLED
+            job["finished_at"] = time.time()
+            await self._notify(job)
+        return job
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict]:
+        """Yield the job each time its status or progress changes, until it finishes."""
+        last = None
+        while True:
+            version = self._version
+            job = await self.aget(job_id)
+            if job is None:
+                return
+            snapshot = (job["status"], job["progress"])
+            if snapshot != last:
+                last = snapshot
+                yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            # Jobs owned by another process don't notify this one, so re-read periodically
+            try:
+                async with self._changed:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: self._version != version), JOB_HEARTBEAT_INTERVAL)
+            except TimeoutError:
+                pass
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.n_workers,
+            "max_queued": self.max_queued,
+            "queued": self.queued_count(),
+            "running": len(self._running),
+            "rejected": self.rejected,
+            **self.finished,
+        }
+
+
+def job_summary(job: Dict) -> Dict:
+    """Public view of a job; the result is only included once it has succeeded."""
+    summary = {k: job[k] for k in ("id", "status", "priority", "progress", "error", "attempts", "created_at", "started_at", "finished_at")}
+    if job["status"] == SUCCEEDED:
+        summary["result"] = job["result"]
+    return summary
@@ -1,26 +1,40 @@
 # langgraph_app.py
 
+import asyncio
+
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph
 from agent.state import OSINTState
+from agent.metrics import instrument_node
 
 from agent.agents.query_parser_agent import query_parser_agent
-from agent.agents.planner_agent import planner_agent
-from agent.agents.retriever_pivot_agent import retriever_pivot_agent
+from agent.agents.planner_agent import PLANNER_MODE, planner_agent
+from agent.agents.parse_plan_agent import parse_and_plan_agent
+from agent.agents.retriever_pivot_agent import is_failed, is_permanent_failure, needs_retry, retriever_pivot_agent
 from agent.agents.synthesis_agent import synthesis_agent
 from agent.agents.judgement_agent import judgement_agent
 from agent.agents.graph_builder_agent import graph_builder_agent
 from agent.agents.deduplication_agent import deduplication_agent
+from agent.incremental import INCREMENTAL_ENABLED, RetrievalPrecompute
+
+MAX_RETRIEVER_PASSES = 2
 
 
 # Agent node wrappers
-def query_parser_node(state: OSINTState) -> dict:
-    parsed = query_parser_agent(state.query)
+@instrument_node("QueryParser")
+async def query_parser_node(state: OSINTState) -> dict:
+    if PLANNER_MODE == "fused":
+        parsed, tasks = await parse_and_plan_agent(state.query)
+    else:
+        parsed, tasks = await query_parser_agent(state.query), []
     print("Parsed Data", parsed)
-    return {"parsed": parsed}
+    # A fused reply with usable tasks lets route_after_parse skip the Planner
+    return {"parsed": parsed, "tasks": tasks} if tasks else {"parsed": parsed}
 
-def planner_node(state: OSINTState) -> dict:
+@instrument_node("Planner")
+async def planner_node(state: OSINTState) -> dict:
     parsed = state.parsed
-    tasks = planner_agent(
+    tasks = await planner_agent(
         parsed.get("entity_type", ""),
         parsed.get("entity_name", ""),
         parsed.get("keywords", ""),
@@ -29,13 +43,99 @@ def planner_node(state: OSINTState) -> dict:
     )
     return {"tasks": tasks} if tasks else {}
 
-def retriever_node(state: OSINTState) -> dict:
+def retry_plan(tasks: list, retrievals: dict) -> dict:
+    """Split tasks that must be re-issued into provider failures and low-confidence answers.
+
+    Non-transient failures (e.g. a 400) are listed under "permanent" and not re-issued.
+    """
+    failed, low_confidence, permanent = [], [], []
+    for i in range(1, len(tasks) + 1):
+        result = retrievals.get(f"task_{i}")
+        if is_permanent_failure(result):
+            permanent.append(i)
+        elif is_failed(result):
+            failed.append(i)
+        elif needs_retry(result):
+            low_confidence.append(i)
+    return {"failed": failed, "low_confidence": low_confidence, "permanent": permanent}
+
+def should_retry_retriever(state: OSINTState) -> bool:
+    if (state.retry_count or 0) >= MAX_RETRIEVER_PASSES:
+        return False
+    retrievals = state.retrievals or {}
+    plan = retry_plan(state.tasks or [], retrievals)
+    # Retry on transient provider failures, or when nothing came back with usable
+    # confidence; tasks that failed permanently are never re-issued
+    unusable = len(plan["low_confidence"]) + len(plan["failed"]) + len(plan["permanent"])
+    all_low = bool(plan["low_confidence"]) and unusable == len(state.tasks or [])
+    return bool(plan["failed"]) or all_low
+
+def route_after_parse(state: OSINTState) -> str:
+    # A fused parse-and-plan call has already filled in the tasks
+    return "Retriever" if state.tasks else "Planner"
+
+def route_entry(state: OSINTState) -> str:
+    # Stages the caller has already filled in (e.g. a batch run) are skipped
+    if not state.parsed:
+        return "QueryParser"
+    if not state.tasks:
+        return "Planner"
+    if not state.retrievals or should_retry_retriever(state):
+        return "Retriever"
+    return "Deduplicator"
+
+@instrument_node("Retriever")
+async def retriever_node(state: OSINTState) -> dict:
     parsed = state.parsed
     model_name = getattr(state, "retrieval_model", "gpt-4o-mini-search-preview")
-    retrievals = retriever_pivot_agent(state.tasks, parsed["entity_name"], model_name)
+    writer = get_stream_writer()
+
+    # Keep results that already passed; only failed or low-confidence tasks are re-issued
+    previous = dict(state.retrievals or {})
+    plan = retry_plan(state.tasks or [], previous)
+    pending = sorted(plan["failed"] + plan["low_confidence"])
+    retry_count = (state.retry_count or 0) + 1
+    print(f"🔁 Retriever pass {retry_count}: {len(pending)} of {len(state.tasks or [])} tasks to run")
+
+    # Embed and tag each retrieval while the remaining searches are still running
+    precompute = RetrievalPrecompute() if INCREMENTAL_ENABLED else None
+
+    def on_result(result: dict):
+        writer({"retrieval": result})
+        if precompute is not None:
+            for retrieval in result.values():
+                precompute.submit(retrieval)
+
+    completed = False
+    try:
+        fresh = await retriever_pivot_agent(
+            state.tasks,
+            parsed["entity_name"],
+            model_name,
+            on_result=on_result,
+            task_numbers=pending,
+            # On later passes, answers that came back thin get a broadened query
+            reformulate=plan["low_confidence"] if retry_count > 1 else (),
+        )
+        completed = True
+    finally:
+        # A failed or cancelled pass must not leave the background worker behind
+        if precompute is not None:
+            if completed:
+                await precompute.drain()
+            else:
+                precompute.cancel()
+    if precompute is not None:
+        print(f"⚡ Precomputed {precompute.processed} retrievals during search ({precompute.busy_seconds:.2f}s)")
+    retrievals = {**previous, **fresh}
+
+    task_errors = {k: list(v) for k, v in (state.task_errors or {}).items()}
+    for task, result in fresh.items():
+        if result.get("errors"):
+            task_errors.setdefault(task, []).extend(result["errors"])
 
     # Update provenance
-    state.provenance = [
+    provenance = [
         {
             "task": task,
             "hash": v.get("hash"),
@@ -44,49 +144,57 @@ def retriever_node(state: OSINTState) -> dict:
             "retrieved": v.get("retrieved"),
             "confidence": v.get("confidence"),
             "decayed_score": v.get("decayed_score"),
+            "attempts": v.get("attempts"),
+            "pass": retry_count if task in fresh else None,
         }
         for task, v in retrievals.items()
     ]
 
-    # Retry logic
-    if state.retry_count is None:
-        state.retry_count = 0
-    state.retry_count += 1
-    print(f"🔁 Retry attempt: {state.retry_count}")
-
-    if not retrievals or all(float(r.get("confidence", 0)) < 0.5 for r in retrievals.values()):
-        if state.retry_count >= 2:
-            print("❌ Max retries reached.")
-            return {"retrievals": {}}
-        print("⚠️ Low-confidence retrievals – retrying...")
-        return {"retrievals": None}
-
-    return {"retrievals": retrievals} if retrievals else {}
-
-def deduplication_node(state: OSINTState) -> dict:
-    filtered = deduplication_agent(state.retrievals)
+    return {
+        "retrievals": retrievals,
+        "retry_count": retry_count,
+        "task_errors": task_errors,
+        "provenance": provenance,
+    }
+
+@instrument_node("Deduplicator")
+async def deduplication_node(state: OSINTState) -> dict:
+    # CPU-bound embedding work runs off the event loop
+    filtered = await asyncio.to_thread(deduplication_agent, state.retrievals)
     print(f"🧼 Deduplication complete: {len(state.retrievals)} → {len(filtered)} items")
     return {"deduplicated": filtered} if filtered else {}
 
-def synthesis_node(state: OSINTState) -> dict:
+@instrument_node("Synthesis")
+async def synthesis_node(state: OSINTState) -> dict:
     parsed = state.parsed
     model_name = getattr(state, "synthesis_model", "gemini-1.5-pro")
-    report = synthesis_agent(state.deduplicated, parsed["entity_name"], model_name)
+    report = await synthesis_agent(state.deduplicated, parsed["entity_name"], model_name)
     return {"report": report} if report else {}
 
-def graph_node(state: OSINTState) -> dict:
-    graph = graph_builder_agent(state.deduplicated)
+@instrument_node("GraphBuilder")
+async def graph_node(state: OSINTState) -> dict:
+    graph = await asyncio.to_thread(graph_builder_agent, state.deduplicated)
     print(f"🕸 GraphBuilder created {len(graph['nodes'])} nodes and {len(graph['edges'])} edges")
     return {"graph": graph} if graph else {}
 
-def judgement_node(state: OSINTState) -> dict:
+@instrument_node("Judgement")
+async def judgement_node(state: OSINTState) -> dict:
     parsed = state.parsed
-    judgement = judgement_agent(parsed["entity_name"], state.report, state.deduplicated)
+    judgement = await judgement_agent(parsed["entity_name"], state.report, state.deduplicated)
     return {"judgement": judgement} if judgement else {}
 
 
 # LangGraph builder
-def build_graph():
+def build_graph(parallel_branches: bool = True, checkpointer=None):
+    """Compiles the OSINT workflow.
+
+    With ``parallel_branches`` the spaCy/networkx GraphBuilder runs alongside the
+    Synthesis LLM call, since it only reads the deduplicated retrievals. Both
+    branches join before Judgement. Pass ``False`` for the original serial chain.
+
+    With a ``checkpointer`` every completed step is saved under the run's
+    ``thread_id``, so a failed run can be resumed instead of started over.
+    """
     graph = StateGraph(OSINTState)
 
     # Register all nodes
@@ -99,17 +207,15 @@ def build_graph():
     graph.add_node("Judgement", judgement_node)
 
     # Set entry point
-    graph.set_entry_point("QueryParser")
+    graph.set_conditional_entry_point(
+        route_entry,
+        ["QueryParser", "Planner", "Retriever", "Deduplicator"]
+    )
 
     # Conditional transition for Retriever
-    def should_retry_retriever(state: dict) -> str:
-        if not state.get("retrievals"):
-            return "retry"
-        return "success"
-
     graph.add_conditional_edges(
         "Retriever",
-        should_retry_retriever,
+        lambda state: "retry" if should_retry_retriever(state) else "success",
         {
             "retry": "Retriever",
             "success": "Deduplicator"
@@ -117,13 +223,18 @@ def build_graph():
     )
 
     # Static edges
-    graph.add_edge("QueryParser", "Planner")
+    graph.add_conditional_edges("QueryParser", route_after_parse, ["Planner", "Retriever"])
     graph.add_edge("Planner", "Retriever")
-    graph.add_edge("Deduplicator", "Synthesis")
-    graph.add_edge("Synthesis", "GraphBuilder")
-    graph.add_edge("GraphBuilder", "Judgement")
+    if parallel_branches:
+        graph.add_edge("Deduplicator", "Synthesis")
+        graph.add_edge("Deduplicator", "GraphBuilder")
+        graph.add_edge(["Synthesis", "GraphBuilder"], "Judgement")
+    else:
+        graph.add_edge("Deduplicator", "Synthesis")
+        graph.add_edge("Synthesis", "GraphBuilder")
+        graph.add_edge("GraphBuilder", "Judgement")
 
     # Set finish point
     graph.set_finish_point("Judgement")
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
@@ -0,0 +1,44 @@
+# src/agent/lru_cache.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU map with batch lookups and hit/miss counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        """Values for ``keys`` in order, with None for each miss."""
+        with self._lock:
+            found = []
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                found.append(value)
+            return found
+
+    def put_many(self, keys: List[str], values: Iterable[Any]):
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def retrieval_key(retrieval: dict) -> str:
+    """Cache key for work derived from a retrieval's text: its content hash."""
+    return retrieval.get("hash") or hashlib.sha256(retrieval.get("data", "").encode()).hexdigest()
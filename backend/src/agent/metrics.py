@@ -0,0 +1,215 @@
+# src/agent/metrics.py
+
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# USD per 1M (input, output) tokens; unknown models are counted at zero cost
+MODEL_PRICES = {
+    "claude-opus-4-20250514": (15.0, 75.0),
+    "claude-3-5-haiku-20241022": (0.8, 4.0),
+    "gpt-4o-mini-search-preview": (0.15, 0.6),
+    "gpt-4o-search-preview": (2.5, 10.0),
+    "gpt-4o": (2.5, 10.0),
+    "gemini-2.0-flash": (0.1, 0.4),
+    "gemini-1.5-pro": (1.25, 5.0),
+}
+# Price of cache reads and writes as multiples of the input price
+CACHE_PRICE_FACTORS = {"anthropic": (0.1, 1.25), "openai": (0.5, 1.0), "gemini": (0.25, 1.0)}
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+# --- Prometheus primitives ---
+
+def escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{format_labels(key + (('le', f'{bound:g}'),))} {count:g}")
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {series[-1]:g}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{format_labels(key)} {series[-1]:g}")
+        return lines
+
+
+NODE_DURATION = Histogram("osint_node_duration_seconds", "Wall time of each LangGraph node run.")
+NODE_RUNS = Counter("osint_node_runs_total", "LangGraph node runs by outcome.")
+PROVIDER_DURATION = Histogram("osint_provider_call_duration_seconds", "Wall time of successful provider calls, excluding queueing.")
+PROVIDER_CALLS = Counter("osint_provider_calls_total", "Provider calls by outcome.")
+PROVIDER_TOKENS = Counter("osint_provider_tokens_total", "Tokens reported by providers, by direction: input (uncached), cache_read, cache_write, output.")
+PROVIDER_COST = Counter("osint_provider_cost_usd_total", "Estimated provider spend from MODEL_PRICES.")
+RETRIES = Counter("osint_retries_total", "Retries by kind: rate_limit (scheduler) or search (per-task).")
+SEARCH_CACHE_LOOKUPS = Counter("osint_search_cache_lookups_total", "Search cache lookups by result.")
+
+REGISTRY = [NODE_DURATION, NODE_RUNS, PROVIDER_DURATION, PROVIDER_CALLS, PROVIDER_TOKENS, PROVIDER_COST, RETRIES, SEARCH_CACHE_LOOKUPS]
+
+
+def render_prometheus() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# --- Per-node usage ---
+
+# Usage of the node currently running; child tasks and threads inherit it via contextvars
+_node_usage: ContextVar[Optional[Dict[str, float]]] = ContextVar("osint_node_usage", default=None)
+
+
+def new_usage() -> Dict[str, float]:
+    return {"runs": 0, "seconds": 0.0, "provider_calls": 0, "provider_seconds": 0.0, "input_tokens": 0,
+            "cached_input_tokens": 0, "cache_write_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+            "retries": 0, "cache_hits": 0, "cache_misses": 0}
+
+
+def _add_usage(**amounts):
+    usage = _node_usage.get()
+    if usage is not None:
+        for key, amount in amounts.items():
+            usage[key] += amount
+
+
+def merge_timings(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    """State reducer: sums per-node usage, so a node that runs twice (Retriever retries) accumulates."""
+    merged = {node: dict(usage) for node, usage in (left or {}).items()}
+    for node, usage in (right or {}).items():
+        if node not in merged:
+            merged[node] = dict(usage)
+            continue
+        for key, amount in usage.items():
+            merged[node][key] = round(merged[node].get(key, 0) + amount, 6)
+    return merged
+
+
+def instrument_node(name: str):
+    """Wrap an async node so its wall time and provider usage land in /metrics and in ``state.timings``."""
+    def decorator(fn: Callable[[Any], Awaitable[dict]]):
+        @functools.wraps(fn)
+        async def wrapper(state):
+            usage = new_usage()
+            token = _node_usage.set(usage)
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                update = await fn(state)
+                outcome = "ok"
+            finally:
+                elapsed = time.perf_counter() - start
+                _node_usage.reset(token)
+                NODE_DURATION.observe(elapsed, node=name)
+                NODE_RUNS.inc(node=name, outcome=outcome)
+            usage["runs"] = 1
+            usage["seconds"] = round(elapsed, 6)
+            usage["provider_seconds"] = round(usage["provider_seconds"], 6)
+            usage["cost_usd"] = round(usage["cost_usd"], 6)
+            return {**(update or {}), "timings": {name: usage}}
+        return wrapper
+    return decorator
+
+
+# --- Recorders ---
+
+def token_usage(response: Any) -> Dict[str, int]:
+    """Uncached input, cache read, cache write and output tokens from an Anthropic, OpenAI or Gemini response."""
+    counts = {"input": 0, "cache_read": 0, "cache_write": 0, "output": 0}
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        if hasattr(usage, "input_tokens"):
+            # Anthropic reports cached prefix tokens separately from input_tokens
+            counts["input"] = int(usage.input_tokens or 0)
+            counts["cache_read"] = int(getattr(usage, "cache_read_input_tokens", 0) or 0)
+            counts["cache_write"] = int(getattr(usage, "cache_creation_input_tokens", 0) or 0)
+            counts["output"] = int(usage.output_tokens or 0)
+        else:
+            # OpenAI includes cached tokens in prompt_tokens
+            cached = int(getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0)
+            counts["input"] = int(getattr(usage, "prompt_tokens", 0) or 0) - cached
+            counts["cache_read"] = cached
+            counts["output"] = int(getattr(usage, "completion_tokens", 0) or 0)
+        return counts
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is not None:
+        cached = int(getattr(metadata, "cached_content_token_count", 0) or 0)
+        counts["input"] = int(getattr(metadata, "prompt_token_count", 0) or 0) - cached
+        counts["cache_read"] = cached
+        counts["output"] = int(getattr(metadata, "candidates_token_count", 0) or 0)
+    return counts
+
+
+def record_provider_call(provider: str, model: str, seconds: float, response: Any = None, outcome: str = "ok"):
+    PROVIDER_CALLS.inc(provider=provider, model=model, outcome=outcome)
+    if outcome != "ok":
+        return
+    PROVIDER_DURATION.observe(seconds, provider=provider, model=model)
+    tokens = token_usage(response)
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    read_factor, write_factor = CACHE_PRICE_FACTORS.get(provider, (1.0, 1.0))
+    cost = (
+        (tokens["input"] + tokens["cache_read"] * read_factor + tokens["cache_write"] * write_factor) * input_price
+        + tokens["output"] * output_price
+    ) / 1e6
+    for direction, count in tokens.items():
+        PROVIDER_TOKENS.inc(count, provider=provider, model=model, direction=direction)
+    PROVIDER_COST.inc(cost, provider=provider, model=model)
+    _add_usage(provider_calls=1, provider_seconds=seconds, input_tokens=tokens["input"], cached_input_tokens=tokens["cache_read"],
+               cache_write_tokens=tokens["cache_write"], output_tokens=tokens["output"], cost_usd=cost)
+
+
+def record_retry(kind: str):
+    RETRIES.inc(kind=kind)
+    _add_usage(retries=1)
+
+
+def record_cache_lookup(hit: bool):
+    SEARCH_CACHE_LOOKUPS.inc(result="hit" if hit else "miss")
+    _add_usage(**{"cache_hits" if hit else "cache_misses": 1})
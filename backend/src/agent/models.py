@@ -0,0 +1,73 @@
+# src/agent/models.py
+
+import logging
+import os
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+SPACY_MODEL_NAME = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# Only doc.ents is read downstream, so everything else in the pipeline is switched off
+NER_UNUSED_COMPONENTS = ["tok2vec", "tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+# Heavy libraries (torch via sentence-transformers, spaCy) are imported on first
+# use so that importing the graph or the API does not pay for them.
+_embedding_model = None
+_embedding_lock = threading.Lock()
+_nlp = None
+_nlp_lock = threading.Lock()
+
+warmup_timings: Dict[str, float] = {}
+
+
+def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+
+                start = time.perf_counter()
+                _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                warmup_timings["embedding_model_load_s"] = round(time.perf_counter() - start, 3)
+                logger.info("🧠 Loaded embedding model %s", EMBEDDING_MODEL_NAME)
+    return _embedding_model
+
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+
+                start = time.perf_counter()
+                nlp = spacy.load(SPACY_MODEL_NAME)
+                for name in NER_UNUSED_COMPONENTS:
+                    if name in nlp.pipe_names:
+                        nlp.disable_pipe(name)
+                # Larger pipelines share tok2vec with NER through a listener; keep it there
+                if "tok2vec" in nlp.component_names and "ner" in getattr(nlp.get_pipe("tok2vec"), "listening_components", []):
+                    nlp.enable_pipe("tok2vec")
+                _nlp = nlp
+                warmup_timings["spacy_model_load_s"] = round(time.perf_counter() - start, 3)
+                logger.info("🧠 Loaded spaCy pipeline %s", SPACY_MODEL_NAME)
+    return _nlp
+
+
+def models_ready() -> Dict[str, bool]:
+    return {
+        "embedding_model": _embedding_model is not None,
+        "spacy_model": _nlp is not None,
+    }
+
+
+def warm_up():
+    """Load both models and run one tiny inference so the first request is not cold."""
+    start = time.perf_counter()
+    get_embedding_model().encode(["warm up"])
+    list(get_nlp().pipe(["Warm up for Jane Doe at Acme in Berlin."]))
+    warmup_timings["warm_up_total_s"] = round(time.perf_counter() - start, 3)
@@ -0,0 +1,109 @@
+# src/agent/profiling.py
+#
+# Opt-in sampling profiler for single investigations. A background thread
+# snapshots every thread's Python stack (sys._current_frames) at a fixed
+# interval, so work offloaded with asyncio.to_thread (spaCy, embeddings) is
+# seen as well as the event loop. Samples are written in folded-stack format
+# ("frame;frame;frame count"), which speedscope.app and flamegraph.pl read
+# directly.
+#
+# The sampler sees the whole process: investigations running concurrently with
+# the profiled one show up in its profile too.
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fraction of investigations profiled without being asked to (0 disables)
+PROFILE_SAMPLE_RATE = float(os.getenv("OSINT_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("OSINT_PROFILE_INTERVAL", "0.005"))
+
+# Leaf frames (file, function) of threads parked waiting for work
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("core.py", "_connection_worker_thread"),
+}
+
+
+def should_profile(requested: bool = False) -> bool:
+    return requested or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="osint-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.seconds = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}").replace(";", ":"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def save(self, path: Path) -> Path:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info("🔥 Profile saved to: %s (%d samples over %.1fs)", path, self.samples, self.seconds)
+        return path
+
+
+@contextmanager
+def profiled(enabled: bool) -> Iterator[Optional[SamplingProfiler]]:
+    """Run the block under a SamplingProfiler when ``enabled``; yield the profiler or None."""
+    if not enabled:
+        yield None
+        return
+    profiler = SamplingProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+def profile_path(state_path: Path) -> Path:
+    """Where the profile of the investigation saved at ``state_path`` lives."""
+    return state_path.with_suffix(".folded")
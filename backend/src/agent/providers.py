@@ -0,0 +1,372 @@
+# src/agent/providers.py
+#
+# Every LLM/search request goes through here so the pipeline can run without
+# network access. OSINT_PROVIDER_MODE selects how requests are served:
+#   live   - call the real provider (default)
+#   record - call the real provider and save each response as a JSON cassette
+#   replay - serve saved cassettes, with synthetic latency, and fail on a miss
+#   stub   - generate plausible payloads locally; no keys or cassettes needed
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+PROVIDER_MODE = os.getenv("OSINT_PROVIDER_MODE", "live")
+CASSETTE_DIR = Path(os.getenv("OSINT_CASSETTE_DIR", "provider_cassettes"))
+# "recorded" (replay only), a fixed number of seconds, a "min-max" range or
+# "lognormal:<median>:<sigma>"; stub latency can be set per purpose with
+# e.g. OSINT_STUB_LATENCY_JUDGEMENT
+REPLAY_LATENCY = os.getenv("OSINT_REPLAY_LATENCY", "recorded")
+REPLAY_LATENCY_SCALE = float(os.getenv("OSINT_REPLAY_LATENCY_SCALE", "1.0"))
+STUB_LATENCY = os.getenv("OSINT_STUB_LATENCY", "0")
+# Anthropic only caches prefixes at least this long
+CACHE_MIN_TOKENS = 1024
+CACHE_MIN_TOKENS_HAIKU = 2048
+
+# Dates and timestamps vary between runs but not between equivalent requests
+_VOLATILE = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"
+    r"|(?:January|February|March|April|May|June|July|August|September|October|November|December) \d{1,2}, \d{4}"
+)
+
+
+class ReplayMissError(Exception):
+    pass
+
+
+# --- Live clients (created on first use, not at import) ---
+
+_clients: Dict[str, Any] = {}
+
+
+def anthropic_client():
+    if "anthropic" not in _clients:
+        from anthropic import AsyncAnthropic
+        _clients["anthropic"] = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    return _clients["anthropic"]
+
+
+def openai_client():
+    if "openai" not in _clients:
+        from openai import AsyncOpenAI
+        _clients["openai"] = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _clients["openai"]
+
+
+def gemini_model(model_name: str):
+    if "gemini" not in _clients:
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _clients["gemini"] = genai
+    return _clients["gemini"].GenerativeModel(model_name)
+
+
+# --- Cassettes ---
+
+def request_key(provider: str, purpose: str, request: Dict) -> str:
+    raw = json.dumps({"provider": provider, "purpose": purpose, "request": request}, sort_keys=True, default=str)
+    return hashlib.sha256(_VOLATILE.sub("<date>", raw).encode()).hexdigest()
+
+
+def cassette_path(provider: str, purpose: str, key: str) -> Path:
+    return CASSETTE_DIR / provider / f"{purpose}-{key}.json"
+
+
+def to_namespace(value: Any) -> Any:
+    """Turn a stored response dict back into something the agents can read by attribute."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+def to_plain(value: Any) -> Any:
+    """Undo to_namespace, for payloads read as data (e.g. tool inputs)."""
+    if isinstance(value, SimpleNamespace):
+        value = vars(value)
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_plain(v) for v in value]
+    return value
+
+
+def tool_input(response: Any, name: str) -> Dict:
+    """Return the input of the ``name`` tool_use block in an Anthropic response, as a plain dict."""
+    for block in response.content:
+        if getattr(block, "type", None) == "tool_use" and block.name == name:
+            return to_plain(block.input)
+    raise ValueError(f"No {name} tool call in response")
+
+
+def parse_latency(spec: str, recorded: float, rng: random.Random) -> float:
+    if spec == "recorded":
+        return recorded * REPLAY_LATENCY_SCALE
+    if spec.startswith("lognormal:"):
+        _, median, sigma = spec.split(":")
+        return rng.lognormvariate(math.log(float(median)), float(sigma))
+    if "-" in spec:
+        low, high = (float(x) for x in spec.split("-", 1))
+        return rng.uniform(low, high)
+    return float(spec)
+
+
+async def serve(
+    provider: str,
+    purpose: str,
+    request: Dict,
+    live_call: Callable[[], Any],
+    dump: Callable[[Any], Dict],
+    stub: Callable[[Dict, random.Random], Dict],
+) -> Any:
+    if PROVIDER_MODE == "live":
+        return await live_call()
+
+    key = request_key(provider, purpose, request)
+    rng = random.Random(key)
+
+    if PROVIDER_MODE == "stub":
+        spec = os.getenv(f"OSINT_STUB_LATENCY_{purpose.upper()}", STUB_LATENCY)
+        await asyncio.sleep(parse_latency(spec, 0.0, rng))
+        return to_namespace(stub(request, rng))
+
+    path = cassette_path(provider, purpose, key)
+    if PROVIDER_MODE == "replay":
+        if not path.exists():
+            raise ReplayMissError(f"No recorded {provider} {purpose} response at {path}")
+        cassette = json.loads(path.read_text(encoding="utf-8"))
+        await asyncio.sleep(parse_latency(REPLAY_LATENCY, cassette.get("latency_s", 0.0), rng))
+        return to_namespace(cassette["response"])
+
+    if PROVIDER_MODE == "record":
+        start = time.perf_counter()
+        response = await live_call()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "provider": provider,
+            "purpose": purpose,
+            "latency_s": round(time.perf_counter() - start, 3),
+            "request": request,
+            "response": dump(response),
+        }, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+        return response
+
+    raise ValueError(f"Unknown OSINT_PROVIDER_MODE: {PROVIDER_MODE}")
+
+
+# --- Stub payloads ---
+
+def prompt_text(request: Dict) -> str:
+    if "prompt" in request:
+        return request["prompt"]
+    return "\n".join(m.get("content", "") for m in request.get("messages", []) if isinstance(m.get("content"), str))
+
+
+def guess_entity(text: str) -> str:
+    words = re.sub(r"^(investigate|research|look up|find|check)\s+", "", text.strip(), flags=re.I)
+    match = re.search(r"[A-Z][\w'.-]+(?:\s+[A-Z][\w'.-]+)+", words)
+    return match.group(0) if match else (words.split(",")[0][:60] or "Unknown Entity")
+
+
+def usage_for(prompt: str, output: str) -> Dict:
+    return {"input_tokens": len(prompt) // 4, "output_tokens": len(output) // 4}
+
+
+_stub_cached_prefixes: set = set()
+
+
+def stub_cache_usage(request: Dict) -> Dict:
+    """Mimic Anthropic prompt caching for cache_control system blocks.
+
+    The first request writes the prefix, later ones read it, and short prefixes aren't cached.
+    """
+    system = request.get("system") or ""
+    blocks = system if isinstance(system, list) else [{"type": "text", "text": system}]
+    prefix = "".join(b.get("text", "") for b in blocks)
+    tokens = len(prefix) // 4
+    if not any(b.get("cache_control") for b in blocks) or tokens < cache_min_tokens(str(request.get("model", ""))):
+        return {"input_tokens": tokens, "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+    key = hashlib.sha256(prefix.encode()).hexdigest()
+    if key in _stub_cached_prefixes:
+        return {"input_tokens": 0, "cache_read_input_tokens": tokens, "cache_creation_input_tokens": 0}
+    _stub_cached_prefixes.add(key)
+    return {"input_tokens": 0, "cache_read_input_tokens": 0, "cache_creation_input_tokens": tokens}
+
+
+def stub_parsed(query: str) -> Dict:
+    is_org = bool(re.search(r"\b(inc|ltd|llc|corp|company|group|gmbh|bank|university)\b", query, re.I))
+    return {
+        "entity_type": "organization" if is_org else "person",
+        "entity_name": guess_entity(query),
+        "keywords": ["career", "business", "news", "legal"],
+        "affiliation": "",
+        "location": "",
+        "nationality": "",
+    }
+
+
+def stub_tasks(entity_name: str) -> list:
+    return [
+        f"Search LinkedIn for current role of {entity_name}",
+        f"Check business registries for companies linked to {entity_name}",
+        f"Find news and media mentions of {entity_name}",
+        f"Search court and legal records mentioning {entity_name}",
+        f"Find academic publications or patents by {entity_name}",
+        f"Check social media presence of {entity_name}",
+        f"Search financial filings mentioning {entity_name}",
+        f"Find conference talks or interviews with {entity_name}",
+    ]
+
+
+def stub_anthropic(purpose: str, request: Dict, rng: random.Random) -> Dict:
+    prompt = prompt_text(request)
+    if purpose == "query_parser":
+        match = re.search(r'Query: "(.*)"', prompt)
+        output = json.dumps(stub_parsed(match.group(1) if match else prompt))
+    elif purpose == "batch_query_parser":
+        queries = re.findall(r'^\d+\. "(.*)"$', prompt, flags=re.M)
+        output = json.dumps([stub_parsed(q) for q in queries])
+    elif purpose == "planner":
+        match = re.search(r"- Entity: (.*) \(", prompt)
+        output = json.dumps(stub_tasks(match.group(1) if match else "the entity"))
+    elif purpose == "parse_and_plan":
+        match = re.search(r'Query: "(.*)"', prompt)
+        parsed = stub_parsed(match.group(1) if match else prompt)
+        output = json.dumps({"parsed": parsed, "tasks": stub_tasks(parsed["entity_name"])})
+    elif purpose == "batch_planner":
+        names = re.findall(r"^\d+\. (.*?) \(", prompt, flags=re.M)
+        output = json.dumps([stub_tasks(name) for name in names])
+    elif purpose == "judgement":
+        risk = rng.randint(1, 6)
+        output = json.dumps({
+            "credibility_score": str(rng.randint(6, 9)),
+            "flagged_issues": ["Some claims rely on a single source."],
+            "risk_assessment": {
+                "risk_score": str(risk),
+                "verdict": "LOW" if risk < 4 else "MEDIUM",
+                "risk_signals": ["No adverse media found in the retrieved evidence."],
+            },
+            "revised_report": "Revised report based on the retrieved evidence.",
+        })
+    else:
+        output = "{}"
+    usage = usage_for(prompt, output)
+    cache = stub_cache_usage(request)
+    usage["input_tokens"] += cache.pop("input_tokens")
+    forced = request.get("tool_choice") or {}
+    if forced.get("type") == "tool":
+        block = {"type": "tool_use", "id": f"toolu_stub_{rng.randrange(16 ** 8):08x}", "name": forced["name"], "input": json.loads(output)}
+        return {"content": [block], "stop_reason": "tool_use", "usage": {**usage, **cache}}
+    return {"content": [{"type": "text", "text": output}], "usage": {**usage, **cache}}
+
+
+def stub_openai(purpose: str, request: Dict, rng: random.Random) -> Dict:
+    prompt = prompt_text(request)
+    match = re.search(r"Task: (.*) about (.*)\. Provide", prompt)
+    task, entity = (match.group(1), match.group(2)) if match else ("the task", "the entity")
+    slug = re.sub(r"\W+", "-", entity.lower()).strip("-")
+    url = f"https://example.org/{slug}/{rng.randint(1000, 9999)}"
+    findings = [
+        f"a {rng.randint(2, 12)}-year track record and {rng.randint(1, 5)} listed roles",
+        f"{rng.randint(1, 40)} press mentions since {rng.randint(2012, 2024)}",
+        f"a registered address and {rng.randint(1, 4)} associated companies",
+        f"no matching records in the searched {rng.choice(['court', 'sanctions', 'insolvency'])} databases",
+    ]
+    content = (
+        f"{task} returned a public source on {entity} reporting {rng.choice(findings)}. "
+        f"Source: [{slug} record {rng.randint(1, 999)}]({url})."
+    )
+    return {
+        "choices": [{"message": {
+            "content": content,
+            "annotations": [{"type": "url_citation", "url_citation": {
+                "url": url, "title": f"{entity} - public record", "start_index": 0, "end_index": len(content),
+            }}],
+        }}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4},
+    }
+
+
+def stub_gemini(purpose: str, request: Dict, rng: random.Random) -> Dict:
+    prompt = prompt_text(request)
+    match = re.search(r"^Subject: \*\*(.*?)\*\*", prompt, flags=re.M)
+    entity = match.group(1) if match else "the entity"
+    text = (
+        f"## OSINT Intelligence Report: {entity}\n\n### Executive Summary\n"
+        f"{entity} has a consistent public footprint across professional and news sources.\n\n"
+        f"### Key Findings\n- Professional profile found.\n- No adverse media identified.\n"
+    )
+    return {"text": text, "usage_metadata": {"prompt_token_count": len(prompt) // 4, "candidates_token_count": len(text) // 4}}
+
+
+# --- Provider calls ---
+
+def cache_min_tokens(model: str) -> int:
+    return CACHE_MIN_TOKENS_HAIKU if "haiku" in model else CACHE_MIN_TOKENS
+
+
+def cached_system(text: str, model: str):
+    """Return an Anthropic ``system`` prompt, marked as a cacheable prefix when it is long enough.
+
+    Prompts shorter than the model's cache minimum are sent as plain text: Anthropic
+    would not cache them anyway.
+    """
+    if len(text) // 4 < cache_min_tokens(model):
+        return text
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def dump_pydantic(response: Any) -> Dict:
+    return response.model_dump(mode="json")
+
+
+def dump_gemini(response: Any) -> Dict:
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "text": response.text,
+        "usage_metadata": {
+            "prompt_token_count": getattr(usage, "prompt_token_count", 0),
+            "candidates_token_count": getattr(usage, "candidates_token_count", 0),
+            "cached_content_token_count": getattr(usage, "cached_content_token_count", 0),
+        },
+    }
+
+
+async def anthropic_messages(purpose: str, **kwargs) -> Any:
+    """``AsyncAnthropic().messages.create(**kwargs)`` under the configured provider mode."""
+    return await serve(
+        "anthropic", purpose, kwargs,
+        lambda: anthropic_client().messages.create(**kwargs),
+        dump_pydantic,
+        lambda request, rng: stub_anthropic(purpose, request, rng),
+    )
+
+
+async def openai_chat(purpose: str, **kwargs) -> Any:
+    """``AsyncOpenAI().chat.completions.create(**kwargs)`` under the configured provider mode."""
+    return await serve(
+        "openai", purpose, kwargs,
+        lambda: openai_client().chat.completions.create(**kwargs),
+        dump_pydantic,
+        lambda request, rng: stub_openai(purpose, request, rng),
+    )
+
+
+async def gemini_generate(purpose: str, model_name: str, prompt: str, generation_config: Optional[Dict] = None) -> Any:
+    """``GenerativeModel(model_name).generate_content_async(...)`` under the configured provider mode."""
+    request = {"model": model_name, "prompt": prompt, "generation_config": generation_config or {}}
+    return await serve(
+        "gemini", purpose, request,
+        lambda: gemini_model(model_name).generate_content_async(prompt, generation_config=generation_config),
+        dump_gemini,
+        lambda request, rng: stub_gemini(purpose, request, rng),
+    )
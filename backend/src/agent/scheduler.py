@@ -0,0 +1,232 @@
+# src/agent/scheduler.py
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from agent.metrics import record_provider_call, record_retry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Per-provider defaults; override with e.g. OPENAI_RATE_LIMIT_RPS / OPENAI_MAX_CONCURRENCY
+PROVIDER_DEFAULTS = {
+    "openai": {"rate": 5.0, "burst": 10, "max_concurrency": 16},
+    "anthropic": {"rate": 2.0, "burst": 4, "max_concurrency": 8},
+    "gemini": {"rate": 5.0, "burst": 10, "max_concurrency": 8},
+}
+SCHEDULER_MAX_RETRIES = int(os.getenv("SCHEDULER_MAX_RETRIES", "5"))
+SCHEDULER_BACKOFF_BASE = float(os.getenv("SCHEDULER_BACKOFF_BASE", "0.5"))
+SCHEDULER_BACKOFF_CAP = float(os.getenv("SCHEDULER_BACKOFF_CAP", "30"))
+# Concurrency only grows while latency stays within this factor of the best seen
+SCHEDULER_LATENCY_TOLERANCE = float(os.getenv("SCHEDULER_LATENCY_TOLERANCE", "2.0"))
+
+
+def is_rate_limited(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "resource exhausted" in message
+
+
+def is_transient(error: Exception) -> bool:
+    """Timeouts, dropped connections, 5xx and 429 are worth retrying; other client errors (400/401/403...) are not."""
+    if isinstance(error, TimeoutError) or is_rate_limited(error):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        return status == 408 or status >= 500
+    # SDK timeout/connection errors (APITimeoutError, APIConnectionError, ...) carry no status
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+class ProviderScheduler:
+    """Token-bucket rate limiter plus an adaptive concurrency cap for one provider/model.
+
+    The cap follows AIMD: it halves on every 429 and grows by roughly one slot per
+    ``limit`` successful calls while latency stays healthy. Rate-limited calls are
+    retried with jittered exponential backoff before the error is surfaced.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_concurrency: int, min_concurrency: int = 1,
+                 provider: Optional[str] = None, model: Optional[str] = None):
+        self.name = name
+        self.provider = provider or name.split(":")[0]
+        self.model = model or name.split(":")[-1]
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.latency_ewma = 0.0
+        self.latency_best = float("inf")
+
+    # --- Admission ---
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def _acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Hand a wake-up we can no longer use to the next waiter
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_waiters()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+        try:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        except BaseException:
+            # Cancelled while waiting for a token: give the slot back
+            self._release()
+            raise
+
+    def _release(self):
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    # --- Feedback ---
+
+    def _on_success(self, latency: float):
+        self.completed += 1
+        self.latency_ewma = latency if self.latency_ewma == 0 else 0.8 * self.latency_ewma + 0.2 * latency
+        self.latency_best = min(self.latency_best, self.latency_ewma)
+        if self.latency_ewma <= self.latency_best * SCHEDULER_LATENCY_TOLERANCE:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def _on_rate_limited(self):
+        self.rate_limited += 1
+        self.limit = max(self.min_concurrency, self.limit / 2)
+
+    def backoff_delay(self, attempt: int) -> float:
+        ceiling = min(SCHEDULER_BACKOFF_CAP, SCHEDULER_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    # --- Public API ---
+
+    async def run(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``make_call()`` once admitted, retrying it when the provider rate-limits."""
+        self.submitted += 1
+        attempt = 0
+        while True:
+            queued_at = time.monotonic()
+            await self._acquire()
+            waited = time.monotonic() - queued_at
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+            started = time.monotonic()
+            # The slot is released however the call ends, cancellation included
+            try:
+                result = await make_call()
+                latency = time.monotonic() - started
+                self._on_success(latency)
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            finally:
+                self._release()
+
+            if error is None:
+                record_provider_call(self.provider, self.model, latency, result)
+                return result
+            if is_rate_limited(error):
+                self._on_rate_limited()
+                record_provider_call(self.provider, self.model, 0.0, outcome="rate_limited")
+                if attempt < SCHEDULER_MAX_RETRIES:
+                    attempt += 1
+                    self.retries += 1
+                    record_retry("rate_limit")
+                    delay = self.backoff_delay(attempt)
+                    logger.warning("⏳ %s rate-limited, retry %d in %.1fs", self.name, attempt, delay)
+                    await asyncio.sleep(delay)
+                    continue
+            else:
+                record_provider_call(self.provider, self.model, 0.0, outcome="error")
+            self.failed += 1
+            raise error
+
+    def metrics(self) -> Dict:
+        return {
+            "scheduler": self.name,
+            "queue_depth": len(self._waiters),
+            "in_flight": self.in_flight,
+            "concurrency_limit": round(self.limit, 2),
+            "tokens": round(self.tokens, 2),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "wait_time_total_s": round(self.wait_time_total, 3),
+            "wait_time_max_s": round(self.wait_time_max, 3),
+            "wait_time_avg_s": round(self.wait_time_total / self.submitted, 3) if self.submitted else 0.0,
+            "latency_ewma_s": round(self.latency_ewma, 3),
+        }
+
+
+_schedulers: Dict[Tuple[str, str], ProviderScheduler] = {}
+
+
+def get_scheduler(provider: str, model: str) -> ProviderScheduler:
+    """Return the process-wide scheduler for a provider/model pair, creating it on first use."""
+    key = (provider, model)
+    if key not in _schedulers:
+        defaults = PROVIDER_DEFAULTS.get(provider, PROVIDER_DEFAULTS["openai"])
+        prefix = provider.upper()
+        _schedulers[key] = ProviderScheduler(
+            name=f"{provider}:{model}",
+            provider=provider,
+            model=model,
+            rate=float(os.getenv(f"{prefix}_RATE_LIMIT_RPS", defaults["rate"])),
+            burst=int(os.getenv(f"{prefix}_RATE_LIMIT_BURST", defaults["burst"])),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", defaults["max_concurrency"])),
+        )
+    return _schedulers[key]
+
+
+def scheduler_metrics() -> List[Dict]:
+    return [s.metrics() for s in _schedulers.values()]
@@ -0,0 +1,147 @@
+# src/agent/search_cache.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+SEARCH_CACHE_DB = os.getenv("SEARCH_CACHE_DB", "search_cache.db")
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and strips punctuation/extra whitespace so near-identical tasks share a key."""
+    text = re.sub(r"[^\w\s]", " ", (text or "").lower())
+    return " ".join(text.split())
+
+
+def make_cache_key(task: str, entity_name: str, model_name: str) -> str:
+    raw = "|".join([normalize_text(task), normalize_text(entity_name), model_name or ""])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SearchCache:
+    """Content-addressed SQLite cache for web search retrievals.
+
+    Entries carry their own TTL, and the table is trimmed back to
+    ``max_entries`` rows by evicting the least recently used keys.
+    """
+
+    def __init__(self, db_file: str = SEARCH_CACHE_DB, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_file, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS search_cache (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            created_at REAL,
+            expires_at REAL,
+            last_accessed REAL
+        )""")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_lru ON search_cache (last_accessed)")
+        conn.commit()
+        conn.close()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("SELECT value, expires_at FROM search_cache WHERE key = ?", (key,))
+        row = c.fetchone()
+
+        if row is None:
+            conn.close()
+            with self._lock:
+                self.misses += 1
+            return None
+
+        value, expires_at = row
+        if expires_at <= now:
+            c.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            conn.commit()
+            conn.close()
+            with self._lock:
+                self.misses += 1
+                self.expirations += 1
+            return None
+
+        c.execute("UPDATE search_cache SET last_accessed = ? WHERE key = ?", (now, key))
+        conn.commit()
+        conn.close()
+        with self._lock:
+            self.hits += 1
+        return json.loads(value)
+
+    def put(self, key: str, value: Dict, ttl_seconds: float):
+        if ttl_seconds <= 0:
+            return
+        now = time.time()
+        conn = self._connect()
+        c = conn.cursor()
+        c.execute("""
+        INSERT OR REPLACE INTO search_cache (key, value, created_at, expires_at, last_accessed)
+        VALUES (?, ?, ?, ?, ?)
+        """, (key, json.dumps(value, ensure_ascii=False), now, now + ttl_seconds, now))
+
+        c.execute("SELECT COUNT(*) FROM search_cache")
+        overflow = c.fetchone()[0] - self.max_entries
+        if overflow > 0:
+            c.execute("""
+            DELETE FROM search_cache WHERE key IN (
+                SELECT key FROM search_cache ORDER BY last_accessed ASC LIMIT ?
+            )""", (overflow,))
+            with self._lock:
+                self.evictions += c.rowcount
+        conn.commit()
+        conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM search_cache")
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        size = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        conn.close()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": size,
+                "max_entries": self.max_entries,
+            }
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache()
+        return _cache
@@ -1,8 +1,10 @@
 # src/agent/state.py
 
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
+from agent.metrics import merge_timings
+
 class OSINTState(BaseModel):
     query: str
 
@@ -12,8 +14,11 @@ class OSINTState(BaseModel):
     report: Optional[str] = ""
     judgement: Optional[Dict[str, Any]] = Field(default_factory=dict)
     retry_count: Optional[int] = Field(default=0)
+    task_errors: Optional[Dict[str, List[str]]] = Field(default_factory=dict)
     provenance: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
     graph: Optional[Dict[str, Any]] = Field(default_factory=dict)
     deduplicated: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    # Per-node wall time, provider usage and retries, summed across repeated runs
+    timings: Annotated[Dict[str, Dict[str, float]], merge_timings] = Field(default_factory=dict)
     retrieval_model: Optional[str] = "claude-opus-4-20250514"
     synthesis_model: Optional[str] = "gemini-1.5-pro"
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from agent.cooccurrence import build_cooccurrence_graph
+
+
+def reference_graph(tasks, entities_per_task, scores) -> dict:
+    """The per-pair loop the sparse engine replaced (networkx add_edge / weight +=)."""
+    nodes, edges = {}, {}
+    for task, entities, score in zip(tasks, entities_per_task, scores):
+        unique_entities = list(dict.fromkeys(entities))
+        for ent in unique_entities:
+            nodes.setdefault(ent, None)
+        for i in range(len(unique_entities)):
+            for j in range(i + 1, len(unique_entities)):
+                pair = frozenset((unique_entities[i], unique_entities[j]))
+                if pair in edges:
+                    edges[pair]["weight"] += score
+                else:
+                    edges[pair] = {"weight": score, "task": task}
+    return {"nodes": list(nodes), "edges": edges}
+
+
+def edge_map(graph: dict) -> dict:
+    edges = {}
+    for edge in graph["edges"]:
+        pair = frozenset((edge["source"], edge["target"]))
+        assert pair not in edges
+        edges[pair] = {"weight": edge["weight"], "task": edge["task"]}
+    return edges
+
+
+def assert_matches_reference(tasks, entities_per_task, scores):
+    expected = reference_graph(tasks, entities_per_task, scores)
+    graph = build_cooccurrence_graph(tasks, entities_per_task, scores)
+
+    assert [node["id"] for node in graph["nodes"]] == expected["nodes"]
+    edges = edge_map(graph)
+    assert edges.keys() == expected["edges"].keys()
+    for pair, edge in expected["edges"].items():
+        assert edges[pair]["task"] == edge["task"]
+        assert edges[pair]["weight"] == pytest.approx(edge["weight"], abs=1e-12)
+
+
+def test_small_graph_with_duplicates_and_zero_scores():
+    tasks = ["t0", "t1", "t2", "t3", "t4"]
+    entities_per_task = [
+        ["Alice", "Acme", "Alice", "Berlin"],
+        ["Acme", "Alice"],
+        [],
+        ["Bob"],
+        ["Berlin", "Bob", "Acme"],
+    ]
+    scores = [0.0, 0.5, 0.9, 0.3, 0.0]
+    assert_matches_reference(tasks, entities_per_task, scores)
+
+    # A pair whose scores sum to zero still gets an edge
+    edges = edge_map(build_cooccurrence_graph(tasks, entities_per_task, scores))
+    assert edges[frozenset(("Alice", "Berlin"))] == {"weight": 0.0, "task": "t0"}
+
+
+def test_no_entities():
+    graph = build_cooccurrence_graph(["t0", "t1"], [[], []], [0.5, 0.5])
+    assert graph == {"nodes": [], "edges": []}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_graphs_match_reference(seed):
+    rng = random.Random(seed)
+    # More than one first-doc block (52 documents) so block boundaries are covered
+    n_tasks = rng.randint(1, 130)
+    vocabulary = [f"E{i}" for i in range(rng.randint(2, 40))]
+    tasks = [f"task {i}" for i in range(n_tasks)]
+    entities_per_task = [rng.choices(vocabulary, k=rng.randint(0, 8)) for _ in tasks]
+    scores = [rng.choice([0.0, round(rng.random(), 3)]) for _ in tasks]
+    assert_matches_reference(tasks, entities_per_task, scores)
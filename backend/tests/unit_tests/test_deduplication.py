@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from agent.agents.deduplication_agent import greedy_keep_mask
+
+
+def reference_keep(similarity_matrix: np.ndarray, similarity_threshold: float) -> list:
+    """The pair-by-pair loop greedy_keep_mask replaced."""
+    n = similarity_matrix.shape[0]
+    keep, remove = [], set()
+    for i in range(n):
+        if i in remove:
+            continue
+        keep.append(i)
+        for j in range(i + 1, n):
+            if similarity_matrix[i][j] > similarity_threshold:
+                remove.add(j)
+    return keep
+
+
+def random_similarities(rng: np.random.Generator, n: int, clusters: int) -> np.ndarray:
+    # Clustered unit vectors, so chains of near-duplicates are common
+    centers = rng.normal(size=(clusters, 16))
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.4 * rng.normal(size=(n, 16))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors @ vectors.T
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("threshold", [0.5, 0.85, 0.95])
+def test_matches_reference_loop(seed, threshold):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 120))
+    similarity_matrix = random_similarities(rng, n, clusters=int(rng.integers(1, 10)))
+
+    keep = greedy_keep_mask(similarity_matrix, threshold)
+    assert np.flatnonzero(keep).tolist() == reference_keep(similarity_matrix, threshold)
+
+
+def test_removed_items_do_not_remove_others():
+    # 1 is a duplicate of 0, and 2 of 1 but not of 0: 1 is dropped, so 2 stays
+    similarity_matrix = np.array([
+        [1.0, 0.9, 0.1],
+        [0.9, 1.0, 0.9],
+        [0.1, 0.9, 1.0],
+    ])
+    assert greedy_keep_mask(similarity_matrix, 0.85).tolist() == [True, False, True]
+    assert reference_keep(similarity_matrix, 0.85) == [0, 2]
+
+
+def test_empty_matrix():
+    assert greedy_keep_mask(np.zeros((0, 0)), 0.85).tolist() == []
@@ -0,0 +1,91 @@
+import pytest
+
+from agent import evidence
+from agent.evidence import TRUNCATION_MARK, count_tokens, link_evidence_ids, pack_evidence, truncate_tokens
+
+
+@pytest.fixture(autouse=True)
+def length_based_tokens(monkeypatch):
+    # Deterministic counts without fetching the tiktoken vocabulary
+    monkeypatch.setattr(evidence, "_encoding", False)
+
+
+def retrieval(data: str, score: float, url: str = "https://www.example.com/a", **extra) -> dict:
+    return {
+        "data": data,
+        "decayed_score": score,
+        "query_used": "Find news about Jane Doe",
+        "published": "2024-05-01T00:00:00",
+        "hash": f"h-{score}",
+        "citations": [{"url": url, "title": "t"}],
+        **extra,
+    }
+
+
+def packed_tokens(text: str) -> int:
+    # pack_evidence counts each block plus one token for the separator
+    return sum(count_tokens(block) + 1 for block in text.split("\n\n"))
+
+
+@pytest.mark.parametrize("budget", [60, 150, 400, 1000])
+def test_stays_within_budget(budget):
+    retrievals = {
+        f"task_{i}": retrieval(f"topic{i} " + " ".join(f"word{i}_{j}" for j in range(40 * i)), 0.1 * i)
+        for i in range(1, 9)
+    }
+    text, index = pack_evidence(retrievals, budget)
+    assert packed_tokens(text) <= budget
+    # Each item can be cut down to fit, except when the budget is below a useful cut
+    assert bool(index) == (budget > 60)
+
+
+def test_item_that_does_not_fit_is_skipped_for_one_that_does():
+    retrievals = {
+        "task_1": retrieval("long " * 2000, 0.9),
+        "task_2": retrieval("Jane Doe works at Acme.", 0.2),
+    }
+    # Too little room left for a useful cut of task_1, but task_2 fits whole
+    text, index = pack_evidence(retrievals, 60)
+    assert [entry["task"] for entry in index.values()] == ["task_2"]
+    assert "Jane Doe works at Acme." in text
+    assert packed_tokens(text) <= 60
+
+
+def test_long_item_is_truncated_to_fit():
+    text, index = pack_evidence({"task_1": retrieval("long " * 2000, 0.9)}, 200)
+    assert list(index) == ["E1"]
+    assert text.count(TRUNCATION_MARK) == 1
+    assert packed_tokens(text) <= 200
+
+
+def test_failed_and_empty_retrievals_are_left_out():
+    retrievals = {
+        "task_1": retrieval("Error: 400 bad request", 0.0, failed=True),
+        "task_2": retrieval("", 0.5),
+    }
+    assert pack_evidence(retrievals, 1000) == ("No usable retrieval evidence.", {})
+
+
+def test_index_traces_ids_back_to_tasks_and_urls():
+    retrievals = {
+        "task_1": retrieval("Jane Doe is the CEO of Acme.", 0.9, url="https://www.acme.com/team"),
+        "task_2": retrieval("Acme was fined in 2021.", 0.3, url="https://news.example.org/acme"),
+    }
+    text, index = pack_evidence(retrievals, 1000)
+    assert index == {
+        "E1": {"task": "task_1", "hash": "h-0.9", "urls": ["https://www.acme.com/team"]},
+        "E2": {"task": "task_2", "hash": "h-0.3", "urls": ["https://news.example.org/acme"]},
+    }
+    assert "Sources: acme.com" in text
+    assert link_evidence_ids("CEO [E1], fined [E2], unknown [E9]", index) == (
+        "CEO [E1](https://www.acme.com/team), fined [E2](https://news.example.org/acme), unknown [E9]"
+    )
+
+
+def test_truncate_tokens_counts_the_mark():
+    text = " ".join(f"word{i}" for i in range(200))
+    for limit in (10, 50, 100):
+        cut = truncate_tokens(text, limit)
+        assert cut.endswith(TRUNCATION_MARK)
+        assert count_tokens(cut) <= limit
+    assert truncate_tokens("short text", 50) == "short text"
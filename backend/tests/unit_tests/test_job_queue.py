@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from agent import job_queue as jq
+from agent.job_queue import JobNotOwnedError, JobQueue
+
+
+async def slow_runner(job, on_progress):
+    on_progress("working")
+    await asyncio.sleep(0.2)
+    return {"query": job["payload"]["query"]}
+
+
+def test_processes_sharing_a_database_run_each_job_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(jq, "JOB_HEARTBEAT_INTERVAL", 0.05)
+    db_file = str(tmp_path / "jobs.db")
+    runs = []
+
+    async def counting_runner(job, on_progress):
+        runs.append(job["id"])
+        return await slow_runner(job, on_progress)
+
+    async def scenario():
+        first = JobQueue(counting_runner, workers=1, db_file=db_file)
+        second = JobQueue(counting_runner, workers=1, db_file=db_file)
+        await first.start()
+        jobs = [await first.submit({"query": f"q{i}"}) for i in range(3)]
+        # Booting another process must not take over jobs the first one holds a live claim on
+        await second.start()
+        assert second.jobs == {}
+        with pytest.raises(JobNotOwnedError):
+            await second.cancel(jobs[2]["id"])
+
+        # Once the first process stops, its released jobs are picked up by the second
+        await first.stop()
+        for _ in range(100):
+            if all(second.get(job["id"])["status"] == jq.SUCCEEDED for job in jobs):
+                break
+            await asyncio.sleep(0.05)
+        await second.stop()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert all(JobQueue(slow_runner, db_file=db_file).get(job["id"])["status"] == jq.SUCCEEDED for job in jobs)
+    # At most the job interrupted by the first process's shutdown runs twice
+    assert set(runs) == {job["id"] for job in jobs}
+    assert len(runs) <= len(jobs) + 1
+
+
+def test_cancel_returns_finished_jobs_evicted_from_memory(tmp_path):
+    async def scenario():
+        queue = JobQueue(slow_runner, workers=1, db_file=str(tmp_path / "jobs.db"))
+        await queue.start()
+        job = await queue.submit({"query": "q"})
+        async for current in queue.watch(job["id"]):
+            pass
+        assert job["id"] not in queue.jobs
+        cancelled = await queue.cancel(job["id"])
+        await queue.stop()
+        return current, cancelled
+
+    current, cancelled = asyncio.run(scenario())
+    assert current["status"] == cancelled["status"] == jq.SUCCEEDED
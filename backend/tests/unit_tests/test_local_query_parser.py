@@ -0,0 +1,80 @@
+import pytest
+
+from agent.agents import local_query_parser
+from agent.agents.local_query_parser import local_parse
+
+spacy = pytest.importorskip("spacy")
+
+ENTITIES = {
+    "PERSON": ["Jane Doe", "John Smith", "Muhammad Aqib Iqbal"],
+    "ORG": ["Acme Corp", "Turing", "Deutsche Bank"],
+    "GPE": ["Berlin", "Oman", "Frankfurt"],
+    "NORP": ["Pakistani"],
+}
+
+
+@pytest.fixture(autouse=True)
+def fake_ner(monkeypatch):
+    # A blank pipeline with fixed patterns stands in for the statistical NER model
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([{"label": label, "pattern": name} for label, names in ENTITIES.items() for name in names])
+    monkeypatch.setattr(local_query_parser, "get_nlp", lambda: nlp)
+
+
+def test_simple_query_is_parsed_confidently():
+    parsed, confidence = local_parse("Investigate Muhammad Aqib Iqbal, software engineer at Turing in Oman")
+    assert parsed == {
+        "entity_type": "person",
+        "entity_name": "Muhammad Aqib Iqbal",
+        "keywords": ["software engineer", "Turing", "Oman", "career", "business", "news"],
+        "affiliation": "Turing",
+        "location": "Oman",
+        "nationality": "",
+    }
+    assert confidence == 1.0
+
+
+def test_organization_subject():
+    parsed, confidence = local_parse("Research Deutsche Bank in Frankfurt")
+    assert parsed["entity_type"] == "organization"
+    assert parsed["entity_name"] == "Deutsche Bank"
+    assert parsed["location"] == "Frankfurt"
+    assert confidence == 1.0
+
+
+def test_nationality():
+    parsed, _ = local_parse("Background check on Jane Doe, Pakistani banker in Berlin")
+    assert parsed["nationality"] == "Pakistani"
+    assert parsed["location"] == "Berlin"
+
+
+def test_multi_subject_query_drops_confidence():
+    _, single = local_parse("Investigate Jane Doe at Acme Corp")
+    parsed, multi = local_parse("Investigate links between Jane Doe and John Smith at Acme Corp")
+    assert parsed["entity_name"] == "Jane Doe"
+    assert multi < single
+    # Below the default threshold, so the query goes to the LLM parser
+    assert multi < 0.75
+
+
+def test_person_after_organization_subject_drops_confidence():
+    _, confidence = local_parse("Investigate Acme Corp and its CEO Jane Doe")
+    assert confidence < 0.75
+
+
+def test_unexplained_proper_nouns_drop_confidence():
+    _, known = local_parse("Investigate Jane Doe in Berlin")
+    _, unknown = local_parse("Investigate Jane Doe in Berlin Kreuzberg Mitte")
+    assert unknown < known
+
+
+def test_unparseable_queries_have_zero_confidence():
+    assert local_parse("  ") == ({}, 0.0)
+    assert local_parse("investigate the company behind the app") == ({}, 0.0)
+
+
+def test_query_without_known_entities_is_left_to_the_llm():
+    parsed, confidence = local_parse("Investigate Zorblax Quantum")
+    assert parsed["entity_name"] == "Zorblax Quantum"
+    assert confidence < 0.75
@@ -0,0 +1,59 @@
+import pytest
+
+from agent.agents.planner_agent import parse_task_list, template_plan, validate_tasks
+
+
+def test_ignores_chatter_around_the_list():
+    reply = """Sure! Here are the tasks [as requested]:
+
+[
+  "Search LinkedIn for current role of Jane Doe at Acme",
+  "Find news and media mentions of Jane Doe in Berlin"
+]
+
+Let me know if you need more."""
+    assert parse_task_list(reply) == [
+        "Search LinkedIn for current role of Jane Doe at Acme",
+        "Find news and media mentions of Jane Doe in Berlin",
+    ]
+
+
+def test_reads_markdown_fenced_and_python_style_lists():
+    assert parse_task_list('```json\n["  a  ", "b"]\n```') == ["a", "b"]
+    assert parse_task_list("Tasks: ['Check registries for Acme', \"Find Acme's filings\"]") == [
+        "Check registries for Acme",
+        "Find Acme's filings",
+    ]
+
+
+def test_never_evaluates_code():
+    with pytest.raises(ValueError):
+        parse_task_list("[__import__('os').getcwd()]")
+
+
+@pytest.mark.parametrize("reply", [
+    "I could not come up with any tasks.",
+    "[]",
+    '["Find news about Jane Doe", 42]',
+    '["Find news about Jane Doe", "   "]',
+    "[unterminated",
+])
+def test_rejects_unusable_replies(reply):
+    with pytest.raises(ValueError):
+        parse_task_list(reply)
+
+
+def test_validate_tasks_accepts_a_tasks_object():
+    assert validate_tasks({"tasks": [" a ", "b"]}) == ["a", "b"]
+    with pytest.raises(ValueError):
+        validate_tasks({"steps": ["a"]})
+    with pytest.raises(ValueError):
+        validate_tasks(None)
+
+
+@pytest.mark.parametrize("entity_type", ["person", "organization"])
+def test_template_plan_names_the_entity(entity_type):
+    tasks = template_plan(entity_type, "Jane Doe", affiliation="Acme", location="Berlin")
+    assert len(tasks) == 8
+    assert len(set(tasks)) == 8
+    assert all("Jane Doe" in task for task in tasks)
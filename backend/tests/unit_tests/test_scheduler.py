@@ -0,0 +1,62 @@
+import asyncio
+
+from agent.scheduler import ProviderScheduler
+
+
+def make_scheduler(**overrides) -> ProviderScheduler:
+    options = {"name": "test:model", "rate": 1000.0, "burst": 100, "max_concurrency": 2}
+    options.update(overrides)
+    return ProviderScheduler(**options)
+
+
+async def never_returns():
+    await asyncio.Event().wait()
+
+
+async def returns_ok():
+    return "ok"
+
+
+def test_cancelled_calls_release_their_slots():
+    async def scenario():
+        scheduler = make_scheduler()
+        calls = [asyncio.create_task(scheduler.run(never_returns)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert scheduler.in_flight == 2
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        assert scheduler.in_flight == 0
+        assert await asyncio.wait_for(scheduler.run(returns_ok), timeout=1) == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_token_wait_releases_slot():
+    async def scenario():
+        scheduler = make_scheduler(rate=0.01, burst=1)
+        scheduler.tokens = 0.0
+        call = asyncio.create_task(scheduler.run(returns_ok))
+        await asyncio.sleep(0.01)
+        assert scheduler.in_flight == 1
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        assert scheduler.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_block_queue():
+    async def scenario():
+        scheduler = make_scheduler(max_concurrency=1)
+        running = asyncio.create_task(scheduler.run(never_returns))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(scheduler.run(returns_ok))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        running.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        assert scheduler.in_flight == 0
+        assert await asyncio.wait_for(scheduler.run(returns_ok), timeout=1) == "ok"
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agent import search_cache
+from agent.search_cache import SearchCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A controllable clock, so TTL and LRU order don't depend on real time
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(search_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def make_cache(tmp_path, max_entries: int = 100) -> SearchCache:
+    return SearchCache(db_file=str(tmp_path / "search_cache.db"), max_entries=max_entries)
+
+
+def test_round_trip_and_stats(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    value = {"data": "Jane Doe works at Acme – Berlin", "confidence": 0.9}
+    assert cache.get("k") is None
+    cache.put("k", value, ttl_seconds=60)
+    assert cache.get("k") == value
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "hit_rate": 0.5, "evictions": 0, "expirations": 0, "size": 1, "max_entries": 100,
+    }
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("short", {"v": 1}, ttl_seconds=10)
+    cache.put("long", {"v": 2}, ttl_seconds=100)
+
+    clock.now += 9
+    assert cache.get("short") == {"v": 1}
+    clock.now += 1
+    assert cache.get("short") is None
+    assert cache.get("long") == {"v": 2}
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    # Expired entries are deleted when read
+    assert stats["size"] == 1
+
+
+def test_zero_ttl_is_not_stored(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("k", {"v": 1}, ttl_seconds=0)
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key}, ttl_seconds=60)
+        clock.now += 1
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == {"key": "a"}
+    clock.now += 1
+
+    cache.put("d", {"key": "d"}, ttl_seconds=60)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == [{"key": "a"}, {"key": "c"}, {"key": "d"}]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 3
+
+
+def test_entries_persist_across_instances(tmp_path, clock):
+    make_cache(tmp_path).put("k", {"v": 1}, ttl_seconds=60)
+    assert make_cache(tmp_path).get("k") == {"v": 1}
+
+
+def test_cache_key_ignores_case_punctuation_and_spacing():
+    key = make_cache_key("Find news about Jane Doe.", "Jane Doe", "gpt-4o-mini-search-preview")
+    assert make_cache_key("  find NEWS about   jane doe ", "jane doe!", "gpt-4o-mini-search-preview") == key
+    assert make_cache_key("Find news about Jane Doe", "Jane Doe", "gpt-4o-search-preview") != key
+    assert make_cache_key("Find court records of Jane Doe", "Jane Doe", "gpt-4o-mini-search-preview") != key